@@ -13,6 +13,6 @@ source /var/app/venv/bin/activate
 cd /var/app/current
 
 # Start gunicorn in the background
-gunicorn --bind 0.0.0.0:8080 --workers 3 main:app --daemon
+gunicorn --config gunicorn.conf.py --bind 0.0.0.0:8080 main:app --daemon
 
 echo "Application started in the background with gunicorn"
\ No newline at end of file
@@ -1,19 +1,26 @@
 import os
 import logging
 from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, make_response
-from scraper import scrape_website
-from linkedin_finder import extract_linkedin_url, find_and_extract_linkedin_about
-# Use enhanced LinkedIn scraper that can handle 999 status code errors
-from enhanced_linkedin_scraper import extract_all_company_data
+from fetch_engine import map_concurrent
+import http_client
+from jobs import manager as job_manager, MAX_JOB_URLS
+from streaming import get_stream_format, stream_batch
+from url_utils import canonicalize_url, dedupe_urls
+from section_utils import parse_sections
+from functools import partial
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Initialize Flask app
+# Initialize Flask app. The scraper modules (and trafilatura/bs4 behind them) are
+# imported inside the handlers, so the app starts without loading them.
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key")
 
+# Cache DNS answers for the whole server process
+http_client.install_dns_cache()
+
 # Set LinkedIn credentials from environment variables 
 os.environ['LINKEDIN_EMAIL'] = os.environ.get('LINKEDIN_EMAIL', '')
 os.environ['LINKEDIN_PASSWORD'] = os.environ.get('LINKEDIN_PASSWORD', '')
@@ -54,6 +61,11 @@ def batch():
 @app.route('/scrape', methods=['POST'])
 def scrape():
     """Handle website scraping requests"""
+    from scraper import scrape_website
+    from linkedin_finder import find_and_extract_linkedin_about
+    # Use enhanced LinkedIn scraper that can handle 999 status code errors
+    from enhanced_linkedin_scraper import extract_all_company_data
+    
     url = request.form.get('url')
     mode = request.form.get('mode', 'direct')  # Default to direct scraping
     use_auth = request.form.get('use_auth', 'false') == 'true'
@@ -157,6 +169,11 @@ def scrape():
 @app.route('/api/scrape', methods=['POST'])
 def api_scrape():
     """API endpoint for scraping websites"""
+    from scraper import scrape_website
+    from linkedin_finder import find_and_extract_linkedin_about
+    # Use enhanced LinkedIn scraper that can handle 999 status code errors
+    from enhanced_linkedin_scraper import extract_all_company_data, SECTION_EXTRACTORS
+    
     data = request.get_json()
     
     if not data or 'url' not in data:
@@ -169,6 +186,15 @@ def api_scrape():
     mode = data.get('mode', 'direct')  # Default to direct scraping
     use_auth = data.get('use_auth', False)  # Authentication option
     
+    # Optional subset of LinkedIn sections to fetch
+    try:
+        sections = parse_sections(data.get('sections'), SECTION_EXTRACTORS)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
     # Add http:// prefix if not present
     if not url.startswith(('http://', 'https://')):
         url = 'https://' + url
@@ -177,7 +203,7 @@ def api_scrape():
         # Authenticated LinkedIn scraping mode
         if use_auth and ('linkedin.com' in url):
             logger.info(f"API: Using authenticated scraping for LinkedIn URL: {url}")
-            enhanced_data = extract_all_company_data(url)
+            enhanced_data = extract_all_company_data(url, sections=sections)
             
             # Create result structure
             result = {
@@ -232,7 +258,7 @@ def api_scrape():
             if use_auth and linkedin_result.get("linkedin_url"):
                 linkedin_url = linkedin_result["linkedin_url"]
                 logger.info(f"API: Using authenticated scraping for found LinkedIn URL: {linkedin_url}")
-                enhanced_data = extract_all_company_data(linkedin_url)
+                enhanced_data = extract_all_company_data(linkedin_url, sections=sections)
                 
                 # Merge the enhanced data with existing data
                 company_data = linkedin_result["company_data"]
@@ -279,6 +305,8 @@ def api_scrape():
 @app.route('/api/find_linkedin', methods=['POST'])
 def api_find_linkedin():
     """API endpoint just for finding LinkedIn URLs without scraping them"""
+    from linkedin_finder import extract_linkedin_url
+    
     data = request.get_json()
     
     if not data or 'url' not in data:
@@ -316,6 +344,144 @@ def api_find_linkedin():
             'error': str(e)
         }), 500
 
+# Modes accepted by /api/batch
+BATCH_MODES = ('find_linkedin', 'linkedin_only', 'direct')
+
+def process_batch_url(url, mode, use_auth):
+    """Process a single batch URL and return its result entry"""
+    from scraper import scrape_website
+    from linkedin_finder import extract_linkedin_url, find_and_extract_linkedin_about
+    from enhanced_linkedin_scraper import extract_all_company_data
+    
+    try:
+        # Canonical form: scheme, lower-case IDNA host, no tracking parameters
+        url = canonicalize_url(url)
+        
+        # Check if this is a LinkedIn URL and authentication is enabled
+        if use_auth and 'linkedin.com' in url and mode == 'direct':
+            # Use authenticated LinkedIn scraping
+            logger.info(f"Batch: Using authenticated scraping for LinkedIn URL: {url}")
+            enhanced_data = extract_all_company_data(url)
+            
+            # Create result structure
+            result_data = {
+                'company_name': "LinkedIn Company",
+                'description': "Data extracted with LinkedIn authentication",
+                'linkedin_data': enhanced_data,
+                'authenticated': True
+            }
+            
+            # Try to get a better company name
+            if enhanced_data.get('people', {}).get('leaders'):
+                for leader in enhanced_data['people']['leaders']:
+                    if 'title' in leader and ('CEO' in leader['title'] or 'Founder' in leader['title']):
+                        company_name = leader['name'].split(' at ')[-1] if ' at ' in leader['name'] else None
+                        if company_name:
+                            result_data['company_name'] = company_name
+            
+            return {
+                'success': True,
+                'url': url,
+                'data': result_data,
+                'authenticated': True
+            }
+        
+        # Process based on mode
+        if mode == 'find_linkedin':
+            # Find LinkedIn URL and extract data
+            result = find_and_extract_linkedin_about(url)
+            
+            if result["success"]:
+                linkedin_url = result["linkedin_url"]
+                company_data = result["company_data"]
+                
+                # If authentication is enabled and LinkedIn URL found, enhance with authenticated data
+                if use_auth and linkedin_url:
+                    logger.info(f"Batch: Using authenticated scraping for found LinkedIn URL: {linkedin_url}")
+                    enhanced_data = extract_all_company_data(linkedin_url)
+                    
+                    # Merge enhanced data
+                    if 'linkedin_data' not in company_data:
+                        company_data['linkedin_data'] = {}
+                    
+                    if enhanced_data.get('posts'):
+                        company_data['linkedin_data']['posts'] = enhanced_data['posts']
+                    if enhanced_data.get('jobs'):
+                        company_data['linkedin_data']['jobs'] = enhanced_data['jobs']
+                    if enhanced_data.get('people'):
+                        company_data['linkedin_data']['people'] = enhanced_data['people']
+                    
+                    return {
+                        'success': True,
+                        'website_url': url,
+                        'linkedin_url': linkedin_url,
+                        'company_data': company_data,
+                        'authenticated': True
+                    }
+                else:
+                    # Regular non-authenticated result
+                    return {
+                        'success': True,
+                        'website_url': url,
+                        'linkedin_url': linkedin_url,
+                        'company_data': company_data
+                    }
+            else:
+                return {
+                    'success': False,
+                    'website_url': url,
+                    'error': result["message"]
+                }
+        
+        elif mode == 'linkedin_only':
+            # Just find LinkedIn URLs without extracting data
+            linkedin_url = extract_linkedin_url(url)
+            
+            if linkedin_url:
+                return {
+                    'success': True,
+                    'website_url': url,
+                    'linkedin_url': linkedin_url
+                }
+            else:
+                return {
+                    'success': False,
+                    'website_url': url,
+                    'error': 'No LinkedIn URL found'
+                }
+        
+        elif mode == 'direct':
+            # Direct scraping of URLs (could be LinkedIn or any website)
+            data = scrape_website(url)
+            
+            if data:
+                return {
+                    'success': True,
+                    'url': url,
+                    'data': data
+                }
+            else:
+                return {
+                    'success': False,
+                    'url': url,
+                    'error': 'Failed to extract data'
+                }
+        
+        else:
+            return {
+                'success': False,
+                'url': url,
+                'error': f'Invalid mode: {mode}'
+            }
+            
+    except Exception as e:
+        logger.error(f"Batch processing error for URL {url}: {str(e)}")
+        return {
+            'success': False,
+            'url': url,
+            'error': str(e)
+        }
+
 @app.route('/api/batch', methods=['POST'])
 def api_batch_process():
     """API endpoint for batch processing multiple URLs"""
@@ -337,144 +503,55 @@ def api_batch_process():
             'error': 'URLs must be provided as an array'
         }), 400
     
+    if mode not in BATCH_MODES:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid mode: {mode}. Use "find_linkedin", "linkedin_only", or "direct".'
+        }), 400
+    
+    # Large batches run as a background job that the client polls
+    if data.get('background', False):
+        if len(urls) > MAX_JOB_URLS:
+            return jsonify({
+                'success': False,
+                'error': f'Maximum {MAX_JOB_URLS} URLs allowed per job'
+            }), 400
+        
+        job = job_manager.submit(
+            partial(process_batch_url, mode=mode, use_auth=use_auth),
+            urls,
+            {'mode': mode, 'use_auth': use_auth}
+        )
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status': job.status,
+            'total': len(urls),
+            'status_url': f'/api/jobs/{job.id}'
+        }), 202
+    
+    # Streamed batches send each result as soon as it finishes
+    stream_format = get_stream_format(data)
+    if stream_format:
+        if len(urls) > MAX_JOB_URLS:
+            return jsonify({
+                'success': False,
+                'error': f'Maximum {MAX_JOB_URLS} URLs allowed in streaming mode'
+            }), 400
+        return stream_batch(partial(process_batch_url, mode=mode, use_auth=use_auth), urls, stream_format)
+    
     if len(urls) > 20:
         return jsonify({
             'success': False,
             'error': 'Maximum 20 URLs allowed in batch mode'
         }), 400
     
-    results = []
+    # Fetch each distinct site once, then fan results back out to every input
+    unique_urls, positions = dedupe_urls(urls)
     
-    for url in urls:
-        try:
-            # Add http:// prefix if not present
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-            
-            # Check if this is a LinkedIn URL and authentication is enabled
-            if use_auth and 'linkedin.com' in url and mode == 'direct':
-                # Use authenticated LinkedIn scraping
-                logger.info(f"Batch: Using authenticated scraping for LinkedIn URL: {url}")
-                enhanced_data = extract_all_company_data(url)
-                
-                # Create result structure
-                result_data = {
-                    'company_name': "LinkedIn Company",
-                    'description': "Data extracted with LinkedIn authentication",
-                    'linkedin_data': enhanced_data,
-                    'authenticated': True
-                }
-                
-                # Try to get a better company name
-                if enhanced_data.get('people', {}).get('leaders'):
-                    for leader in enhanced_data['people']['leaders']:
-                        if 'title' in leader and ('CEO' in leader['title'] or 'Founder' in leader['title']):
-                            company_name = leader['name'].split(' at ')[-1] if ' at ' in leader['name'] else None
-                            if company_name:
-                                result_data['company_name'] = company_name
-                
-                results.append({
-                    'success': True,
-                    'url': url,
-                    'data': result_data,
-                    'authenticated': True
-                })
-                continue
-            
-            # Process based on mode
-            if mode == 'find_linkedin':
-                # Find LinkedIn URL and extract data
-                result = find_and_extract_linkedin_about(url)
-                
-                if result["success"]:
-                    linkedin_url = result["linkedin_url"]
-                    company_data = result["company_data"]
-                    
-                    # If authentication is enabled and LinkedIn URL found, enhance with authenticated data
-                    if use_auth and linkedin_url:
-                        logger.info(f"Batch: Using authenticated scraping for found LinkedIn URL: {linkedin_url}")
-                        enhanced_data = extract_all_company_data(linkedin_url)
-                        
-                        # Merge enhanced data
-                        if 'linkedin_data' not in company_data:
-                            company_data['linkedin_data'] = {}
-                        
-                        if enhanced_data.get('posts'):
-                            company_data['linkedin_data']['posts'] = enhanced_data['posts']
-                        if enhanced_data.get('jobs'):
-                            company_data['linkedin_data']['jobs'] = enhanced_data['jobs']
-                        if enhanced_data.get('people'):
-                            company_data['linkedin_data']['people'] = enhanced_data['people']
-                        
-                        results.append({
-                            'success': True,
-                            'website_url': url,
-                            'linkedin_url': linkedin_url,
-                            'company_data': company_data,
-                            'authenticated': True
-                        })
-                    else:
-                        # Regular non-authenticated result
-                        results.append({
-                            'success': True,
-                            'website_url': url,
-                            'linkedin_url': linkedin_url,
-                            'company_data': company_data
-                        })
-                else:
-                    results.append({
-                        'success': False,
-                        'website_url': url,
-                        'error': result["message"]
-                    })
-            
-            elif mode == 'linkedin_only':
-                # Just find LinkedIn URLs without extracting data
-                linkedin_url = extract_linkedin_url(url)
-                
-                if linkedin_url:
-                    results.append({
-                        'success': True,
-                        'website_url': url,
-                        'linkedin_url': linkedin_url
-                    })
-                else:
-                    results.append({
-                        'success': False,
-                        'website_url': url,
-                        'error': 'No LinkedIn URL found'
-                    })
-            
-            elif mode == 'direct':
-                # Direct scraping of URLs (could be LinkedIn or any website)
-                data = scrape_website(url)
-                
-                if data:
-                    results.append({
-                        'success': True,
-                        'url': url,
-                        'data': data
-                    })
-                else:
-                    results.append({
-                        'success': False,
-                        'url': url,
-                        'error': 'Failed to extract data'
-                    })
-            
-            else:
-                return jsonify({
-                    'success': False,
-                    'error': f'Invalid mode: {mode}. Use "find_linkedin", "linkedin_only", or "direct".'
-                }), 400
-                
-        except Exception as e:
-            logger.error(f"Batch processing error for URL {url}: {str(e)}")
-            results.append({
-                'success': False,
-                'url': url,
-                'error': str(e)
-            })
+    # Process URLs concurrently with per-host limits; results keep input order
+    unique_results = map_concurrent(partial(process_batch_url, mode=mode, use_auth=use_auth), unique_urls)
+    results = [unique_results[position] for position in positions]
     
     return jsonify({
         'success': True,
@@ -484,5 +561,68 @@ def api_batch_process():
         'failed': sum(1 for r in results if not r.get('success', False))
     })
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def api_job_status(job_id):
+    """API endpoint for polling a background job's progress and partial results"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    
+    return jsonify({
+        'success': True,
+        **job.to_dict(offset=max(offset, 0), limit=limit)
+    })
+
+@app.route('/api/jobs/<job_id>/resume', methods=['POST'])
+def api_resume_job(job_id):
+    """API endpoint for resuming an interrupted job from its checkpoint"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    options = job.options
+    job = job_manager.resume(job_id, partial(
+        process_batch_url,
+        mode=options.get('mode', 'find_linkedin'),
+        use_auth=options.get('use_auth', False)
+    ))
+    # Finished jobs are only resumable from the checkpoint journal, and a
+    # completed one has nothing left to process
+    if job is None or job.status == 'completed':
+        return jsonify({
+            'success': False,
+            'error': 'Job has nothing to resume'
+        }), 409
+    
+    return jsonify({
+        'success': True,
+        'remaining': len(job.pending_indexes),
+        **job.to_dict(include_results=False)
+    }), 202
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def api_cancel_job(job_id):
+    """API endpoint for cancelling a background job"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        **job.to_dict(include_results=False)
+    })
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
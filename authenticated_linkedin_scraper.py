@@ -9,8 +9,15 @@ import re
 import os
 import time
 import random
+import threading
 import requests
-from bs4 import BeautifulSoup
+from functools import partial
+from html_parsing import make_soup
+from http_client import fetch, new_session, read_page
+from fetch_engine import run_parallel
+from section_utils import parse_sections
+from singleflight import SingleFlight
+from url_utils import canonical_key
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +27,23 @@ logger = logging.getLogger(__name__)
 LINKEDIN_EMAIL = os.environ.get('LINKEDIN_EMAIL', '')
 LINKEDIN_PASSWORD = os.environ.get('LINKEDIN_PASSWORD', '')
 
+# Seconds the result of the LinkedIn access probe is trusted before probing again
+LOGIN_PROBE_TTL = 30 * 60
+
+# Last probed session as (session, authenticated, probe_time). Threads never use it
+# directly: each one works on its own copy of its headers and cookies.
+_session_lock = threading.Lock()
+_published_session = None
+
+# Held by the one thread probing LinkedIn access; others keep using the last result
+_probe_lock = threading.Lock()
+
+_thread_sessions = threading.local()
+
+# Concurrent fetches of the same page (e.g. sections falling back to the main
+# company page) share one request
+PAGE_FLIGHTS = SingleFlight('fetch_linkedin_page')
+
 def setup_authenticated_session():
     """
     Set up an authenticated session with LinkedIn using provided credentials
@@ -27,8 +51,8 @@ def setup_authenticated_session():
     Returns:
         requests.Session: Authenticated session with LinkedIn cookies
     """
-    # Create a session to maintain cookies
-    session = requests.Session()
+    # Create a session to maintain cookies; connections come from the shared pools
+    session = new_session()
     
     # Set headers to mimic a browser
     session.headers.update({
@@ -92,7 +116,7 @@ def login_to_linkedin(session):
         test_company_url = 'https://www.linkedin.com/company/microsoft/'
         try:
             logger.info(f"Testing LinkedIn access with: {test_company_url}")
-            test_response = session.get(test_company_url, timeout=10)
+            test_response = fetch(test_company_url, session=session, timeout=10)
             
             if test_response.status_code == 200:
                 logger.info("Successfully accessed LinkedIn company page with limited access")
@@ -117,10 +141,80 @@ def login_to_linkedin(session):
         logger.error(f"Error during LinkedIn access setup: {str(e)}")
         return False
 
+def get_authenticated_session(use_auth=True):
+    """
+    Get this thread's LinkedIn session, probing access at most once per LOGIN_PROBE_TTL
+    
+    The probe runs outside _session_lock on a new session, which is then published
+    for every thread to copy. While one thread refreshes it, the others keep using
+    the previous result instead of waiting on the LinkedIn round-trip.
+    
+    Args:
+        use_auth: Whether to use authentication (default True)
+    
+    Returns:
+        tuple: (session, authenticated_status)
+    """
+    with _session_lock:
+        published = _published_session
+    
+    if _needs_probe(published, use_auth):
+        # Only the very first session is waited for
+        if _probe_lock.acquire(blocking=published is None):
+            try:
+                published = _probe_session(use_auth)
+            finally:
+                _probe_lock.release()
+        else:
+            logger.debug("LinkedIn access probe already running, using the previous session")
+    
+    template, authenticated, _ = published
+    if getattr(_thread_sessions, 'template', None) is not template:
+        _thread_sessions.session = _copy_session(template)
+        _thread_sessions.template = template
+    
+    return _thread_sessions.session, (authenticated if use_auth else False)
+
+def _needs_probe(published, use_auth):
+    """Check whether the published session is missing or its access probe expired"""
+    if published is None:
+        return True
+    return use_auth and time.time() - published[2] > LOGIN_PROBE_TTL
+
+def _probe_session(use_auth):
+    """Build (and with use_auth, probe) a new session and publish it; call with _probe_lock held"""
+    global _published_session
+    
+    with _session_lock:
+        published = _published_session
+    # Another thread may have published while this one waited for _probe_lock
+    if not _needs_probe(published, use_auth):
+        return published
+    
+    session = setup_authenticated_session()
+    if use_auth:
+        published = (session, login_to_linkedin(session), time.time())
+    else:
+        published = (session, False, 0)
+    
+    with _session_lock:
+        _published_session = published
+    return published
+
+def _copy_session(template):
+    """Create a session with the template's headers and cookies for one thread"""
+    session = new_session()
+    session.headers.clear()
+    session.headers.update(template.headers)
+    session.cookies.update(template.cookies)
+    return session
+
 def fetch_linkedin_page(url, use_auth=True):
     """
     Fetch a LinkedIn page with optional authentication
     
+    Concurrent calls for the same canonical URL share one request.
+    
     Args:
         url: LinkedIn URL to fetch
         use_auth: Whether to use authentication (default True)
@@ -128,24 +222,19 @@ def fetch_linkedin_page(url, use_auth=True):
     Returns:
         tuple: (html_content, authenticated_status)
     """
-    session = setup_authenticated_session()
-    authenticated = False
-    
-    if use_auth:
-        authenticated = login_to_linkedin(session)
+    return PAGE_FLIGHTS.do((canonical_key(url), use_auth), _fetch_linkedin_page, url, use_auth)
+
+def _fetch_linkedin_page(url, use_auth):
+    """Fetch a LinkedIn page without sharing the request (see fetch_linkedin_page)"""
+    session, authenticated = get_authenticated_session(use_auth)
     
     try:
         # Fetch the requested URL with appropriate timeout
         logger.info(f"Fetching LinkedIn page: {url}")
         
-        # Add jitter to seem more human-like
-        try:
-            time.sleep(0.5 + random.random() * 0.5)  # Random delay between 0.5-1s
-        except (KeyboardInterrupt, SystemExit):
-            logger.warning("Sleep interrupted during page fetch")
-            pass
-        
-        response = session.get(url, timeout=15, allow_redirects=True)
+        # Pacing comes from LinkedIn's rate limit bucket rather than a fixed sleep
+        # Bodies are streamed so the page size limits apply (see http_client.read_page)
+        response = fetch(url, session=session, timeout=15, stream=True)
         
         # Check status code
         if response.status_code != 200:
@@ -157,13 +246,18 @@ def fetch_linkedin_page(url, use_auth=True):
                 logger.warning("LinkedIn rate limit exceeded (429 Too Many Requests)")
                 
             # For certain status codes, we'll try to continue with the content we have
-            if response.status_code in [403, 429] and response.text:
-                logger.info("Using partial response content despite error status code")
-                html_content = response.text
-            else:
+            if response.status_code not in [403, 429]:
+                response.close()
+                return None, authenticated
+            page = read_page(response)
+            if not page or not page['text']:
                 return None, authenticated
+            logger.info("Using partial response content despite error status code")
         else:
-            html_content = response.text
+            page = read_page(response)
+            if page is None:
+                return None, authenticated
+        html_content = page['text']
         
         # Verify we didn't get redirected to login
         if 'uas/login' in response.url:
@@ -216,7 +310,7 @@ def extract_company_posts(linkedin_url):
         }
     
     # Parse with BeautifulSoup
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = make_soup(html_content)
     
     # Initialize posts data
     posts_data = {
@@ -239,7 +333,7 @@ def extract_company_posts(linkedin_url):
         # Try to extract post count from the main page
         main_page_html, _ = fetch_linkedin_page(linkedin_url)
         if main_page_html:
-            main_soup = BeautifulSoup(main_page_html, 'html.parser')
+            main_soup = make_soup(main_page_html)
             post_count_element = main_soup.find(['span', 'div'], string=re.compile(r'(\d+)\s*(posts?|updates?|articles?)', re.I))
             
             if post_count_element:
@@ -358,7 +452,7 @@ def extract_company_jobs(linkedin_url):
         }
     
     # Parse with BeautifulSoup
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = make_soup(html_content)
     
     # Initialize jobs data
     jobs_data = {
@@ -382,7 +476,7 @@ def extract_company_jobs(linkedin_url):
         # Try to extract job count from the main page
         main_page_html, _ = fetch_linkedin_page(linkedin_url)
         if main_page_html:
-            main_soup = BeautifulSoup(main_page_html, 'html.parser')
+            main_soup = make_soup(main_page_html)
             job_count_element = main_soup.find(['span', 'div'], string=re.compile(r'(\d+)\s*(job|position|opening)', re.I))
             
             if job_count_element:
@@ -543,7 +637,7 @@ def extract_company_people(linkedin_url):
         }
     
     # Parse with BeautifulSoup
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = make_soup(html_content)
     
     # Initialize people data
     people_data = {
@@ -568,7 +662,7 @@ def extract_company_people(linkedin_url):
         # Try to extract employee count from the main page
         main_page_html, _ = fetch_linkedin_page(linkedin_url)
         if main_page_html:
-            main_soup = BeautifulSoup(main_page_html, 'html.parser')
+            main_soup = make_soup(main_page_html)
             
             # Try different patterns for employee count
             text_content = main_soup.get_text()
@@ -837,31 +931,44 @@ def extract_company_people(linkedin_url):
     logger.info(f"Extracted people data with authentication: {len(people_data['leaders'])} leaders, {len(people_data['departments'])} departments, {len(people_data['locations'])} locations")
     return people_data
 
-def extract_all_company_data(linkedin_url):
+# Section name -> extractor, in the order sections appear in the combined result
+SECTION_EXTRACTORS = {
+    'posts': extract_company_posts,
+    'jobs': extract_company_jobs,
+    'people': extract_company_people
+}
+
+def extract_all_company_data(linkedin_url, sections=None):
     """
     Extract all company data from LinkedIn using authentication
     
+    The requested sections are fetched and parsed concurrently.
+    
     Args:
         linkedin_url: LinkedIn company profile URL
+        sections: Sections to extract, any of 'posts', 'jobs', 'people', as a list or
+                  comma-separated string (default all)
     
     Returns:
         dict: Complete company data including posts, jobs, and people
     """
-    result = {}
-    
-    # Extract posts data
-    posts_data = extract_company_posts(linkedin_url)
-    if posts_data:
-        result['posts'] = posts_data
+    try:
+        sections = parse_sections(sections, SECTION_EXTRACTORS)
+    except ValueError as e:
+        logger.warning(f"Invalid LinkedIn sections requested: {str(e)}")
+        return {
+            'error': str(e)
+        }
     
-    # Extract jobs data
-    jobs_data = extract_company_jobs(linkedin_url)
-    if jobs_data:
-        result['jobs'] = jobs_data
+    section_data = run_parallel({
+        section: partial(extractor, linkedin_url)
+        for section, extractor in SECTION_EXTRACTORS.items() if section in sections
+    })
     
-    # Extract people data
-    people_data = extract_company_people(linkedin_url)
-    if people_data:
-        result['people'] = people_data
+    # Only keep sections that returned data
+    result = {}
+    for section, data in section_data.items():
+        if data:
+            result[section] = data
     
-    return result
\ No newline at end of file
+    return result
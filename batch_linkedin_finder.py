@@ -8,19 +8,54 @@ and finds their LinkedIn company profile URLs.
 Usage:
     python batch_linkedin_finder.py url1 url2 url3 ...
     python batch_linkedin_finder.py --file urls.txt
+    python batch_linkedin_finder.py --file urls.txt --workers 16
+    zcat urls.txt.gz | python batch_linkedin_finder.py --file - --jsonl
 
 Output formats:
     --json : Output results as JSON
+    --jsonl : Output results as JSON Lines
     --csv : Output results as CSV
     Default: Simple text output
+
+Input is read lazily and every result is written and flushed as soon as it is
+available, so very large lists run in constant memory and partial output
+survives a crash.
+
+Concurrency:
+    --workers N : Process N URLs at a time (default 1)
+    --processes : Use a process pool instead of threads (the processes share
+                  per-host rate limits through a temporary SQLite file unless
+                  SCRAPER_RATE_LIMIT_DB is set)
+    --async : Use the asyncio fetch engine (adds per-host concurrency limits)
+    --order completion : Output results as they finish instead of in input order
+
+Checkpointing:
+    --checkpoint FILE : Journal every finished URL to a SQLite file
+    --resume : Reuse results already in the checkpoint instead of refetching them
+    Each input (file path, or the URLs given on the command line) is journaled as
+    its own run, so one checkpoint file can hold several inputs.
 """
 
 import argparse
 import csv
+import gzip
+import hashlib
+import itertools
 import json
 import logging
+import os
 import sys
+import tempfile
+import time
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from linkedin_finder import extract_linkedin_url
+import fetch_engine
+import http_client
+import rate_limiter
+from fetch_engine import iter_completed
+from checkpoint import CheckpointJournal
+from url_utils import canonicalize_url
 from urllib.parse import urlparse
 
 # Configure logging
@@ -33,9 +68,8 @@ logger = logging.getLogger(__name__)
 
 def process_url(url):
     """Process a single URL and return the result"""
-    # Add http:// prefix if not present
-    if not url.startswith(('http://', 'https://')):
-        url = 'https://' + url
+    # Canonical form, so spellings of one site share a single fetch
+    url = canonicalize_url(url)
     
     try:
         # Extract domain for display
@@ -70,102 +104,438 @@ def process_url(url):
             'error': str(e)
         }
 
+# Prefix of the run IDs under which the CLI journals results in a checkpoint file
+CHECKPOINT_RUN_PREFIX = 'batch_linkedin_finder'
+
+def checkpoint_run_id(file=None, urls=None):
+    """
+    Get the checkpoint run ID for an input
+
+    Args:
+        file: Input file path ('-' for stdin)
+        urls: URLs given on the command line (used when there is no file)
+
+    Returns:
+        str: Run ID derived from the absolute file path, or from the URL list
+    """
+    if file == '-':
+        source = '<stdin>'
+    elif file:
+        source = os.path.abspath(file)
+    else:
+        source = '\n'.join(urls or [])
+    return f"{CHECKPOINT_RUN_PREFIX}:{hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]}"
+
+_journals = {}
+
+def get_journal(path):
+    """Get the checkpoint journal for a file (one object per process)"""
+    if path not in _journals:
+        _journals[path] = CheckpointJournal(path)
+    return _journals[path]
+
+def process_url_checkpointed(url, checkpoint_path, run_id, resume=False):
+    """
+    Process a URL, journaling its result in a checkpoint file
+
+    Args:
+        url: URL as it appears in the input
+        checkpoint_path: SQLite checkpoint file
+        run_id: Checkpoint run of this input (see checkpoint_run_id)
+        resume: Return the journaled result instead of refetching if there is one
+
+    Returns:
+        dict: Result, as from process_url
+    """
+    journal = get_journal(checkpoint_path)
+    if resume:
+        stored = journal.lookup(run_id, url)
+        if stored is not None:
+            return stored
+
+    result = process_url(url)
+    journal.record(run_id, url, result)
+    return result
+
+def iter_results_serial(urls, func=process_url):
+    """Process URLs one at a time, yielding (index, url, result)"""
+    for index, url in enumerate(urls):
+        yield index, url, func(url)
+
+def iter_results_pool(urls, workers, use_processes=False, func=process_url, admit=None):
+    """
+    Process URLs on a thread or process pool, yielding (index, url, result) as they finish
+
+    At most a few URLs per worker are queued at once, so the pool never holds the
+    whole input. If admit is given, a URL is only submitted once admit(index) is
+    True (see InputOrder). Each process has its own in-memory rate limiter, so unless
+    SCRAPER_RATE_LIMIT_DB is set a process pool shares per-host limits through a
+    temporary state file.
+    """
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    window = workers * 4
+
+    pool_options = {}
+    state_dir = None
+    if use_processes and not rate_limiter.limiter.state_path:
+        state_dir = tempfile.TemporaryDirectory(prefix='scraper-rate-limits-')
+        pool_options = {
+            'initializer': rate_limiter.use_state_file,
+            'initargs': (os.path.join(state_dir.name, 'rate-limits.sqlite'),)
+        }
+
+    try:
+        with executor_class(max_workers=workers, **pool_options) as executor:
+            pending = {}
+            url_iter = enumerate(urls)
+            exhausted = False
+            held = None
+
+            while pending or not exhausted:
+                while not exhausted and len(pending) < window:
+                    if held is None:
+                        try:
+                            held = next(url_iter)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                    if admit is not None and not admit(held[0]):
+                        break
+                    index, url = held
+                    held = None
+                    pending[executor.submit(func, url)] = (index, url)
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, url = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {
+                            'success': False,
+                            'website_url': url,
+                            'domain': urlparse(url).netloc,
+                            'linkedin_url': None,
+                            'error': str(e)
+                        }
+                    yield index, url, result
+    finally:
+        if state_dir is not None:
+            state_dir.cleanup()
+
+def iter_results_async(urls, workers, func=process_url, admit=None):
+    """Process URLs on the asyncio fetch engine, yielding (index, url, result) as they finish"""
+    if workers > fetch_engine.MAX_CONCURRENCY:
+        # The engine's shared thread pool would otherwise cap --workers
+        logger.info(f"Sizing the fetch pool for {workers} workers (SCRAPER_MAX_CONCURRENCY={fetch_engine.MAX_CONCURRENCY})")
+        fetch_engine.set_executor_size(workers)
+    for index, url, result in iter_completed(func, urls, max_pending=workers * 4, admit=admit,
+                                             max_concurrency=workers):
+        if isinstance(result, Exception):
+            result = {
+                'success': False,
+                'website_url': url,
+                'domain': urlparse(url).netloc,
+                'linkedin_url': None,
+                'error': str(result)
+            }
+        yield index, url, result
+
+class InputOrder:
+    """
+    Re-sequences (index, url, result) tuples into input order
+
+    Results that finish early are buffered until every earlier URL is done. The
+    producers check admits() before starting a URL, so nothing more than `window`
+    places past the oldest unfinished URL is started and one slow URL cannot make
+    the buffer grow without limit.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.next_index = 0
+
+    def admits(self, index):
+        """Check whether the URL at index may be started"""
+        return index < self.next_index + self.window
+
+    def reorder(self, indexed_results):
+        """Yield indexed_results in input order"""
+        buffered = {}
+        for index, url, result in indexed_results:
+            buffered[index] = (index, url, result)
+            while self.next_index in buffered:
+                item = buffered.pop(self.next_index)
+                self.next_index += 1
+                yield item
+
+class Progress:
+    """Progress and throughput line written to stderr"""
+
+    def __init__(self, total=None, stream=sys.stderr, interval=5.0):
+        self.total = total
+        self.stream = stream
+        self.interval = interval
+        self.is_tty = stream.isatty()
+        self.started = time.monotonic()
+        self.last_report = 0.0
+        self.done = 0
+        self.found = 0
+
+    def update(self, result):
+        """Count one finished URL and redraw the progress line if due"""
+        self.done += 1
+        if result.get('success'):
+            self.found += 1
+
+        now = time.monotonic()
+        if self.is_tty or now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report()
+
+    def report(self, final=False):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        total = f"/{self.total}" if self.total else ""
+        line = (f"[{self.done}{total}] {self.done / elapsed:.1f} URLs/s, "
+                f"{self.found} found, {elapsed:.0f}s elapsed")
+        if self.is_tty:
+            self.stream.write("\r" + line.ljust(79) + ("\n" if final else ""))
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
 def read_urls_from_file(filename):
-    """Read URLs from a file, one URL per line"""
+    """
+    Yield URLs from a file one line at a time
+
+    Args:
+        filename: Path to a text file, a .gz file, or '-' for stdin
+
+    Yields:
+        str: Each non-empty, stripped line
+    """
     try:
-        with open(filename, 'r') as f:
-            urls = [line.strip() for line in f if line.strip()]
-        return urls
+        if filename == '-':
+            f = sys.stdin
+        elif filename.endswith('.gz'):
+            f = gzip.open(filename, 'rt', encoding='utf-8', errors='replace')
+        else:
+            f = open(filename, 'r', encoding='utf-8', errors='replace')
     except Exception as e:
         logger.error(f"Error reading file {filename}: {str(e)}")
-        return []
+        return
+
+    try:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+class JsonWriter:
+    """Writes a JSON array one element at a time"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+        self.stream.write("[")
+
+    def write(self, result):
+        separator = "," if self.count else ""
+        body = json.dumps(result, indent=2).replace("\n", "\n  ")
+        self.stream.write(f"{separator}\n  {body}")
+        self.stream.flush()
+        self.count += 1
+
+    def close(self):
+        self.stream.write("\n]\n" if self.count else "]\n")
+        self.stream.flush()
+
+class JsonlWriter:
+    """Writes one JSON object per line"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, result):
+        self.stream.write(json.dumps(result) + "\n")
+        self.stream.flush()
+
+    def close(self):
+        self.stream.flush()
+
+class CsvWriter:
+    """Writes one CSV row per result"""
+
+    fieldnames = ['website_url', 'domain', 'linkedin_url', 'success']
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.writer = csv.DictWriter(stream, fieldnames=self.fieldnames, extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write(self, result):
+        self.writer.writerow(result)
+        self.stream.flush()
+
+    def close(self):
+        self.stream.flush()
+
+class TextWriter:
+    """Writes a simple text table, with the totals at the end"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.found = 0
+        self.total = 0
+        self.stream.write("Website".ljust(40) + "LinkedIn URL\n")
+        self.stream.write("-" * 80 + "\n")
+
+    def write(self, result):
+        self.total += 1
+        if result['success']:
+            self.found += 1
+        linkedin_url = result['linkedin_url'] or "Not found"
+        self.stream.write(f"{result['domain'].ljust(40)} {linkedin_url}\n")
+        self.stream.flush()
+
+    def close(self):
+        self.stream.write(f"\nResults: Found {self.found} LinkedIn URLs out of {self.total} websites\n")
+        self.stream.flush()
+
+def write_results(results, writer_class, stream=None):
+    """Write an iterable of results with one of the writers above"""
+    writer = writer_class(stream or sys.stdout)
+    for result in results:
+        writer.write(result)
+    writer.close()
 
 def output_results_as_json(results):
     """Output results in JSON format"""
-    print(json.dumps(results, indent=2))
+    write_results(results, JsonWriter)
 
 def output_results_as_csv(results):
     """Output results in CSV format"""
-    fieldnames = ['website_url', 'domain', 'linkedin_url', 'success']
-    writer = csv.DictWriter(sys.stdout, fieldnames=fieldnames, extrasaction='ignore')
-    writer.writeheader()
-    for result in results:
-        writer.writerow(result)
+    write_results(results, CsvWriter)
 
 def output_results_as_text(results):
     """Output results in simple text format"""
-    found_count = sum(1 for r in results if r['success'])
-    total_count = len(results)
-    
-    print(f"\nResults: Found {found_count} LinkedIn URLs out of {total_count} websites\n")
-    print("Website".ljust(40) + "LinkedIn URL")
-    print("-" * 80)
-    
-    for result in results:
-        domain = result['domain']
-        linkedin_url = result['linkedin_url'] or "Not found"
-        print(f"{domain.ljust(40)} {linkedin_url}")
+    write_results(results, TextWriter)
 
 def main():
     parser = argparse.ArgumentParser(description='Batch LinkedIn URL Finder')
     parser.add_argument('urls', nargs='*', help='List of website URLs to process')
-    parser.add_argument('--file', '-f', help='File containing URLs, one per line')
+    parser.add_argument('--file', '-f', help="File containing URLs, one per line ('-' for stdin, .gz supported)")
     parser.add_argument('--json', action='store_true', help='Output results as JSON')
+    parser.add_argument('--jsonl', action='store_true', help='Output results as JSON Lines')
     parser.add_argument('--csv', action='store_true', help='Output results as CSV')
     parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+    parser.add_argument('--workers', '-w', type=int, default=1, help='Number of URLs processed at a time (default: 1)')
+    parser.add_argument('--processes', action='store_true', help='Use a process pool instead of threads')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Use the asyncio fetch engine with per-host concurrency limits')
+    parser.add_argument('--order', choices=['input', 'completion'], default='input',
+                        help='Output results in input order (default) or as they finish')
+    parser.add_argument('--no-progress', action='store_true', help='Do not print progress to stderr')
+    parser.add_argument('--checkpoint', help='SQLite file journaling every finished URL')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip URLs already journaled in --checkpoint, reusing their results')
     args = parser.parse_args()
     
-    # Get URLs from either command line or file
-    urls = []
+    if args.resume and not args.checkpoint:
+        parser.error('--resume requires --checkpoint')
+    
+    http_client.install_dns_cache()
+    
+    # Get URLs from either command line or file (files are read lazily)
+    total = None
     if args.file:
         urls = read_urls_from_file(args.file)
     elif args.urls:
         urls = args.urls
+        total = len(urls)
     else:
         parser.print_help()
         sys.exit(1)
     
-    if not urls:
+    urls = iter(urls)
+    first_url = next(urls, None)
+    if first_url is None:
         logger.error("No URLs to process")
         sys.exit(1)
+    urls = itertools.chain([first_url], urls)
     
-    logger.info(f"Processing {len(urls)} URLs...")
+    logger.info(f"Processing {total if total is not None else 'streamed'} URLs...")
     
-    # Process URLs
-    results = []
-    for url in urls:
-        result = process_url(url)
-        results.append(result)
+    # Journal results so an interrupted run can be resumed
+    func = process_url
+    if args.checkpoint:
+        run_id = checkpoint_run_id(args.file, args.urls)
+        journal = get_journal(args.checkpoint)
+        journal.prune()
+        if args.resume:
+            run = journal.get_run(run_id)
+            logger.info(f"Resuming: {run['completed'] if run else 0} URLs already in checkpoint")
+        journal.start_run(run_id, options={'file': args.file})
+        func = partial(process_url_checkpointed, checkpoint_path=args.checkpoint, run_id=run_id, resume=args.resume)
     
-    # Redirect output if needed
-    if args.output:
-        original_stdout = sys.stdout
-        try:
-            with open(args.output, 'w') as f:
-                sys.stdout = f
-                if args.json:
-                    output_results_as_json(results)
-                elif args.csv:
-                    output_results_as_csv(results)
-                else:
-                    output_results_as_text(results)
-        finally:
-            sys.stdout = original_stdout
+    # Process URLs (politeness per host is enforced by the shared rate limiter)
+    workers = max(1, args.workers)
+    order = InputOrder(window=workers * 4) if args.order == 'input' else None
+    admit = order.admits if order else None
+    if args.use_async:
+        indexed_results = iter_results_async(urls, workers, func=func, admit=admit)
+    elif workers > 1:
+        indexed_results = iter_results_pool(urls, workers, use_processes=args.processes, func=func, admit=admit)
     else:
-        # Output to stdout
-        if args.json:
-            output_results_as_json(results)
-        elif args.csv:
-            output_results_as_csv(results)
-        else:
-            output_results_as_text(results)
+        indexed_results = iter_results_serial(urls, func=func)
+    
+    if order:
+        indexed_results = order.reorder(indexed_results)
+    
+    if args.json:
+        writer_class = JsonWriter
+    elif args.jsonl:
+        writer_class = JsonlWriter
+    elif args.csv:
+        writer_class = CsvWriter
+    else:
+        writer_class = TextWriter
+    
+    # Each result is written and flushed as soon as it is available
+    output = open(args.output, 'w', newline='' if args.csv else None) if args.output else sys.stdout
+    progress = None if args.no_progress else Progress(total=total)
+    processed = 0
+    found_count = 0
+    try:
+        writer = writer_class(output)
+        for index, url, result in indexed_results:
+            writer.write(result)
+            processed += 1
+            if result['success']:
+                found_count += 1
+            if progress:
+                progress.update(result)
+        writer.close()
+    finally:
+        if progress:
+            progress.report(final=True)
+        if output is not sys.stdout:
+            output.close()
+    
+    if args.checkpoint:
+        get_journal(args.checkpoint).set_status(run_id, 'completed')
     
     # Summary
-    found_count = sum(1 for r in results if r['success'])
-    logger.info(f"Finished processing {len(urls)} URLs")
+    logger.info(f"Finished processing {processed} URLs")
     logger.info(f"Found {found_count} LinkedIn URLs")
     
     return 0
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
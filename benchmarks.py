@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Extraction Benchmarks
+
+This script measures the CPU-bound parts of the scraper on saved HTML pages and
+checks that faster code paths produce the same output as the reference ones.
+
+Usage:
+    python benchmarks.py parsers --corpus pages/
+    python benchmarks.py parsers --corpus pages/ --backends html.parser lxml --repeat 5
+    python benchmarks.py regex --corpus pages/
+    python benchmarks.py history --corpus pages/
+    python benchmarks.py imports --module main --max-ms 500
+
+A corpus is a directory of saved .html pages. Without --corpus the pages in
+benchmark_pages/ are used. The imports report needs no corpus: it imports a module in a
+fresh interpreter with `python -X importtime` and summarizes where startup time goes.
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+
+# Keep extractor logging out of the report
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Saved pages checked in with the repo, used when no --corpus is given. They include
+# malformed markup (unclosed tags, stray end tags) where tree builders disagree.
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_pages')
+
+def load_corpus(directory=None):
+    """
+    Load the pages to benchmark
+
+    Args:
+        directory: Directory of .html files (None for DEFAULT_CORPUS)
+
+    Returns:
+        list: (name, html) tuples
+    """
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory or DEFAULT_CORPUS, '*.htm*'))):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+def normalize(value):
+    """Make results comparable: drop timings and sort lists (set order is arbitrary)"""
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items() if k != 'timings'}
+    if isinstance(value, (list, tuple)):
+        return sorted((normalize(v) for v in value), key=lambda v: json.dumps(v, sort_keys=True))
+    return value
+
+def time_call(func, repeat):
+    """Run func repeat times and return (best seconds, last result)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def benchmark_parsers(pages, backends, repeat):
+    """
+    Compare HTML parser backends on the full business-info extraction
+
+    The first backend is the reference; every other backend must produce the same
+    normalized result on every page.
+
+    Returns:
+        int: Number of pages whose output differed from the reference
+    """
+    import trafilatura
+    import html_parsing
+    from scraper import extract_business_info
+
+    available = html_parsing.available_backends()
+    backends = [backend for backend in backends if backend in available]
+    if not backends:
+        print(f"None of the requested backends are installed (available: {', '.join(available)})")
+        return 1
+
+    totals = {backend: 0.0 for backend in backends}
+    mismatches = 0
+    total_bytes = 0
+
+    print(f"{'page':40} {'KB':>8} " + " ".join(f"{backend:>12}" for backend in backends))
+    for name, html in pages:
+        clean_content = trafilatura.extract(html)
+        if not clean_content:
+            print(f"{name:40} skipped (no main content)")
+            continue
+
+        total_bytes += len(html.encode('utf-8'))
+        reference = None
+        row = []
+        differences = []
+        for backend in backends:
+            html_parsing.set_backend(backend)
+            seconds, result = time_call(
+                lambda: extract_business_info(html, clean_content, f"https://example.com/{name}"), repeat
+            )
+            totals[backend] += seconds
+            result = normalize(json.loads(json.dumps(result)))
+            if reference is None:
+                reference = result
+                row.append(f"{seconds * 1000:10.1f}ms")
+            else:
+                same = result == reference
+                mismatches += not same
+                row.append(f"{seconds * 1000:10.1f}ms" + (" " if same else "!"))
+                if not same:
+                    fields = sorted(key for key in set(reference) | set(result)
+                                    if reference.get(key) != result.get(key))
+                    differences.append(f"    {backend}: {', '.join(fields)}")
+        print(f"{name:40} {len(html) / 1024:8.1f} " + " ".join(f"{cell:>12}" for cell in row))
+        for line in differences:
+            print(line)
+
+    html_parsing.set_backend(html_parsing.DEFAULT_BACKEND)
+
+    megabytes = total_bytes / (1024 * 1024) or 1
+    print("-" * 80)
+    for backend in backends:
+        print(f"{backend:12} total {totals[backend] * 1000:9.1f}ms  "
+              f"{megabytes / totals[backend] if totals[backend] else 0:8.2f} MB/s")
+    if mismatches:
+        print(f"{mismatches} page(s) marked '!' differ from the {backends[0]} output")
+    else:
+        print(f"All backends match the {backends[0]} output")
+    return mismatches
+
+def benchmark_regex(pages, repeat):
+    """
+    Compare the per-entity regex scans with the single-pass EntityExtractor
+
+    Both run over the text extract_business_info scans (main content plus the
+    page's text nodes, links, meta tags and JSON-LD).
+
+    Returns:
+        int: Number of pages whose entities differed between the two
+    """
+    import trafilatura
+    from html_parsing import make_soup
+    from scraper import (ENTITY_EXTRACTOR, extract_page_text, extract_emails,
+                         extract_phones, extract_addresses, extract_social_media)
+
+    def separate(text):
+        entities = {'email': extract_emails(text), 'phone': extract_phones(text),
+                    'address': extract_addresses(text)}
+        entities.update(extract_social_media(text))
+        return entities
+
+    def combined(text):
+        return ENTITY_EXTRACTOR.extract(text)
+
+    def comparable(entities):
+        return {name: sorted(set(values)) for name, values in entities.items() if values}
+
+    totals = {'separate': 0.0, 'combined': 0.0}
+    mismatches = 0
+    total_bytes = 0
+
+    print(f"{'page':40} {'KB':>8} {'separate':>12} {'combined':>12}")
+    for name, html in pages:
+        text = f"{trafilatura.extract(html) or ''} {extract_page_text(make_soup(html))}"
+        total_bytes += len(text.encode('utf-8'))
+
+        separate_seconds, reference = time_call(lambda: separate(text), repeat)
+        combined_seconds, result = time_call(lambda: combined(text), repeat)
+        totals['separate'] += separate_seconds
+        totals['combined'] += combined_seconds
+
+        reference, result = comparable(reference), comparable(result)
+        same = result == reference
+        mismatches += not same
+        print(f"{name:40} {len(text) / 1024:8.1f} {separate_seconds * 1000:10.2f}ms "
+              f"{combined_seconds * 1000:10.2f}ms" + (" " if same else "!"))
+        if not same:
+            for entity in sorted(set(reference) | set(result)):
+                for value in sorted(set(reference.get(entity, [])) - set(result.get(entity, []))):
+                    print(f"    - {entity}: {value!r}")
+                for value in sorted(set(result.get(entity, [])) - set(reference.get(entity, []))):
+                    print(f"    + {entity}: {value!r}")
+
+    megabytes = total_bytes / (1024 * 1024) or 1
+    print("-" * 80)
+    for method, seconds in totals.items():
+        print(f"{method:12} total {seconds * 1000:9.2f}ms  {megabytes / seconds if seconds else 0:8.2f} MB/s")
+    if mismatches:
+        print(f"{mismatches} page(s) marked '!' differ between the combined and separate scans")
+    else:
+        print("Both methods find the same entities")
+    return mismatches
+
+def benchmark_history(pages, repeat):
+    """
+    Compare extract_company_history with and without the keyword prefilter
+
+    Running every pattern on every paragraph is the reference; the prefiltered
+    run must produce the same result on every page.
+
+    Returns:
+        int: Number of pages whose output differed from the reference
+    """
+    import trafilatura
+    from scraper import extract_company_history
+
+    totals = {'all paragraphs': 0.0, 'prefiltered': 0.0}
+    mismatches = 0
+    total_bytes = 0
+
+    print(f"{'page':40} {'KB':>8} {'all paragraphs':>15} {'prefiltered':>12}")
+    for name, html in pages:
+        text = trafilatura.extract(html)
+        if not text:
+            print(f"{name:40} skipped (no main content)")
+            continue
+        company_name = os.path.splitext(name)[0].replace('-', ' ').title()
+        total_bytes += len(text.encode('utf-8'))
+
+        full_seconds, reference = time_call(
+            lambda: extract_company_history(text, company_name, prefilter=False), repeat
+        )
+        fast_seconds, result = time_call(lambda: extract_company_history(text, company_name), repeat)
+        totals['all paragraphs'] += full_seconds
+        totals['prefiltered'] += fast_seconds
+
+        same = result == reference
+        mismatches += not same
+        print(f"{name:40} {len(text) / 1024:8.1f} {full_seconds * 1000:13.2f}ms "
+              f"{fast_seconds * 1000:10.2f}ms" + (" " if same else "!"))
+
+    megabytes = total_bytes / (1024 * 1024) or 1
+    print("-" * 80)
+    for method, seconds in totals.items():
+        print(f"{method:15} total {seconds * 1000:9.2f}ms  {megabytes / seconds if seconds else 0:8.2f} MB/s")
+    if mismatches:
+        print(f"{mismatches} page(s) marked '!' differ from the unfiltered output")
+    else:
+        print("Prefiltered output matches on every page")
+    return mismatches
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+def import_report(module, top=15, max_ms=None):
+    """
+    Report how long importing a module takes in a fresh interpreter
+
+    Args:
+        module: Module to import, e.g. 'main'
+        top: Number of slowest imports to list
+        max_ms: Fail if the total import time exceeds this many milliseconds
+
+    Returns:
+        int: 0, or 1 if the import failed or exceeded max_ms
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True
+    )
+
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append((name, len(indent) // 2, int(self_us), int(cumulative_us)))
+
+    if completed.returncode != 0:
+        print(f"import {module} failed:")
+        print("\n".join(line for line in completed.stderr.splitlines() if not IMPORTTIME_LINE.match(line)))
+        return 1
+
+    # -X importtime lists a module after everything it imported, so the modules
+    # loaded by `import module` are the rows between the previous top-level
+    # entry (interpreter startup) and the module's own row
+    end = max((index for index, entry in enumerate(imports) if entry[0] == module and entry[1] == 0),
+              default=len(imports) - 1)
+    start = end
+    while start > 0 and imports[start - 1][1] > 0:
+        start -= 1
+    imports = imports[start:end + 1]
+    total_ms = imports[-1][3] / 1000 if imports else 0.0
+
+    print(f"import {module}: {total_ms:.1f}ms, {len(imports)} modules")
+    print()
+    print(f"Slowest top-level imports of {module} (cumulative):")
+    children = [entry for entry in imports if entry[1] == 1]
+    for name, _, _, cumulative in sorted(children, key=lambda entry: -entry[3])[:top]:
+        print(f"  {cumulative / 1000:9.1f}ms  {name}")
+    print()
+    print("Slowest modules by their own import time:")
+    for name, _, self_us, _ in sorted(imports, key=lambda entry: -entry[2])[:top]:
+        print(f"  {self_us / 1000:9.1f}ms  {name}")
+
+    if max_ms is not None and total_ms > max_ms:
+        print(f"\nimport {module} took {total_ms:.1f}ms, over the {max_ms:g}ms budget")
+        return 1
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Scraper extraction benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    parsers_cmd = subparsers.add_parser('parsers', help='Compare HTML parser backends')
+    parsers_cmd.add_argument('--corpus', help='Directory of saved .html pages (default: benchmark_pages/)')
+    parsers_cmd.add_argument('--backends', nargs='+', default=['html.parser', 'lxml'],
+                             help='Backends to compare; the first is the reference')
+    parsers_cmd.add_argument('--repeat', type=int, default=3, help='Runs per page (best time is reported)')
+
+    regex_cmd = subparsers.add_parser('regex', help='Measure contact/social regex throughput')
+    regex_cmd.add_argument('--corpus', help='Directory of saved .html pages (default: benchmark_pages/)')
+    regex_cmd.add_argument('--repeat', type=int, default=5, help='Runs per page (best time is reported)')
+
+    history_cmd = subparsers.add_parser('history', help='Measure the company history extractor')
+    history_cmd.add_argument('--corpus', help='Directory of saved .html pages (default: benchmark_pages/)')
+    history_cmd.add_argument('--repeat', type=int, default=3, help='Runs per page (best time is reported)')
+
+    imports_cmd = subparsers.add_parser('imports', help='Report module import (startup) time')
+    imports_cmd.add_argument('--module', default='main', help='Module to import (default: main)')
+    imports_cmd.add_argument('--top', type=int, default=15, help='Number of slowest imports to list')
+    imports_cmd.add_argument('--max-ms', type=float, help='Exit with status 1 if the import takes longer')
+
+    args = parser.parse_args()
+
+    # Benchmarks never touch the network caches
+    os.environ.setdefault('SCRAPER_DISK_CACHE', '')
+
+    if args.command == 'parsers':
+        pages = load_corpus(args.corpus)
+        return 1 if benchmark_parsers(pages, args.backends, max(1, args.repeat)) else 0
+    if args.command == 'regex':
+        pages = load_corpus(args.corpus)
+        return 1 if benchmark_regex(pages, max(1, args.repeat)) else 0
+    if args.command == 'history':
+        pages = load_corpus(args.corpus)
+        return 1 if benchmark_history(pages, max(1, args.repeat)) else 0
+    if args.command == 'imports':
+        return import_report(args.module, args.top, args.max_ms)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""
+Checkpoint Journal
+
+This module records the progress of long batch runs in a SQLite file so they can
+resume after a crash, restart or deploy:
+1. Each run stores its URL list and options once
+2. Every finished URL is journaled with its result as soon as it completes
+3. A resumed run skips everything already journaled
+4. Runs owned by a live process send heartbeats, so other processes can tell a run
+   that is still going from one that died, and can ask its owner to cancel it
+5. Finished and abandoned runs are pruned after a retention period
+
+Used by the batch_linkedin_finder CLI (--checkpoint/--resume) and by background
+jobs (see jobs.py). Set SCRAPER_CHECKPOINT_DB to move the journal, or to an empty
+string to disable it for jobs.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# SQLite file holding job checkpoints ('' disables job checkpoints)
+CHECKPOINT_PATH = os.environ.get(
+    'SCRAPER_CHECKPOINT_DB', os.path.join(tempfile.gettempdir(), 'scraper-checkpoints.sqlite')
+)
+
+# Seconds without a heartbeat after which a queued or running run counts as abandoned
+HEARTBEAT_TIMEOUT = float(os.environ.get('SCRAPER_CHECKPOINT_HEARTBEAT_TIMEOUT', '60'))
+
+# Seconds a run is kept after its last activity before prune() deletes it
+CHECKPOINT_RETENTION = float(os.environ.get('SCRAPER_CHECKPOINT_RETENTION', str(7 * 24 * 60 * 60)))
+
+# Statuses of runs that still have an owner working on them (while it sends heartbeats)
+ACTIVE_STATUSES = ('queued', 'running')
+
+# SQL condition for a run whose owner sent a heartbeat after the given cutoff
+LIVE_CONDITION = f"status IN {ACTIVE_STATUSES} AND COALESCE(heartbeat, 0) >= ?"
+
+class CheckpointJournal:
+    """
+    SQLite journal of batch runs and their per-URL results
+
+    Connections are per thread and per process, so one journal object can be used
+    from worker threads and from forked worker processes.
+    """
+
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def _connection(self):
+        """Get this thread's connection, creating the schema on first use"""
+        if os.getpid() != self._pid:
+            # Never reuse a connection inherited across fork
+            self._pid = os.getpid()
+            self._local = threading.local()
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS runs ('
+                'run_id TEXT PRIMARY KEY, urls TEXT, options TEXT, status TEXT NOT NULL, '
+                'created_at REAL NOT NULL, updated_at REAL NOT NULL, '
+                'owner_pid INTEGER, heartbeat REAL, cancel_requested INTEGER NOT NULL DEFAULT 0)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'run_id TEXT NOT NULL, url TEXT NOT NULL, idx INTEGER, success INTEGER, '
+                'result TEXT NOT NULL, completed_at REAL NOT NULL, PRIMARY KEY (run_id, url))'
+            )
+            self._local.conn = conn
+        return conn
+
+    def start_run(self, run_id, urls=None, options=None, status='running', owner=None):
+        """
+        Register a run, keeping its existing entries if it was started before
+
+        Args:
+            run_id: Run identifier
+            urls: Full URL list (stored so the run can be resumed without the input)
+            options: JSON-serializable run options
+            status: Initial status
+            owner: PID of the process running it, if it sends heartbeats
+        """
+        now = time.time()
+        self._connection().execute(
+            'INSERT INTO runs (run_id, urls, options, status, created_at, updated_at, owner_pid, heartbeat) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(run_id) DO UPDATE SET '
+            'status = excluded.status, updated_at = excluded.updated_at, '
+            'owner_pid = excluded.owner_pid, heartbeat = excluded.heartbeat, '
+            'urls = COALESCE(excluded.urls, runs.urls), options = COALESCE(excluded.options, runs.options)',
+            (
+                run_id,
+                json.dumps(list(urls)) if urls is not None else None,
+                json.dumps(options) if options is not None else None,
+                status, now, now, owner, now if owner is not None else None
+            )
+        )
+
+    def claim(self, run_id, owner, timeout=HEARTBEAT_TIMEOUT):
+        """
+        Take over a run that is unfinished and not owned by a live process
+
+        Args:
+            run_id: Run identifier
+            owner: PID of the process that will run it
+            timeout: Seconds without a heartbeat after which the current owner counts as dead
+
+        Returns:
+            bool: True if the run is now queued for this owner, False if it is
+                  completed, unknown or still running elsewhere
+        """
+        now = time.time()
+        cursor = self._connection().execute(
+            "UPDATE runs SET status = 'queued', owner_pid = ?, heartbeat = ?, cancel_requested = 0, "
+            f"updated_at = ? WHERE run_id = ? AND status != 'completed' AND NOT ({LIVE_CONDITION})",
+            (owner, now, now, run_id, now - timeout)
+        )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, run_ids, owner):
+        """
+        Mark runs as still alive and check them for cancellation requests
+
+        Args:
+            run_ids: Runs this owner is working on
+            owner: PID of the owning process
+
+        Returns:
+            set: IDs of those runs that another process asked to cancel
+        """
+        run_ids = list(run_ids)
+        if not run_ids:
+            return set()
+
+        conn = self._connection()
+        placeholders = ', '.join('?' * len(run_ids))
+        conn.execute(
+            f'UPDATE runs SET heartbeat = ? WHERE owner_pid = ? AND run_id IN ({placeholders})',
+            (time.time(), owner, *run_ids)
+        )
+        rows = conn.execute(
+            f'SELECT run_id FROM runs WHERE cancel_requested = 1 AND run_id IN ({placeholders})', run_ids
+        )
+        return {row[0] for row in rows}
+
+    def request_cancel(self, run_id, timeout=HEARTBEAT_TIMEOUT):
+        """
+        Ask a run to stop
+
+        A run with a live owner is flagged and its owner cancels it on its next
+        heartbeat; an abandoned run is marked 'cancelled' so it is not resumed.
+
+        Args:
+            run_id: Run identifier
+            timeout: Seconds without a heartbeat after which the owner counts as dead
+
+        Returns:
+            bool: True if a live owner will stop the run
+        """
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            f"UPDATE runs SET cancel_requested = 1, updated_at = ?, status = CASE WHEN {LIVE_CONDITION} "
+            "THEN status ELSE 'cancelled' END WHERE run_id = ? AND status NOT IN ('completed', 'failed', 'cancelled')",
+            (now, now - timeout, run_id)
+        )
+        row = conn.execute(
+            f'SELECT 1 FROM runs WHERE run_id = ? AND {LIVE_CONDITION}', (run_id, now - timeout)
+        ).fetchone()
+        return row is not None
+
+    def set_status(self, run_id, status):
+        """Update a run's status, e.g. 'completed' or 'cancelled'"""
+        self._connection().execute(
+            'UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?', (status, time.time(), run_id)
+        )
+
+    def get_run(self, run_id, timeout=HEARTBEAT_TIMEOUT):
+        """
+        Get a run's stored details and progress
+
+        Args:
+            run_id: Run identifier
+            timeout: Seconds without a heartbeat after which the owner counts as dead
+
+        Returns:
+            dict: run_id, urls, options, status, timestamps, owner_pid, whether a live
+                  owner is running it, whether cancellation was requested, and
+                  completed and successful counts, or None if the run is unknown
+        """
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT urls, options, status, created_at, updated_at, owner_pid, heartbeat, cancel_requested '
+            'FROM runs WHERE run_id = ?', (run_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        completed, successful = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(success), 0) FROM entries WHERE run_id = ?', (run_id,)
+        ).fetchone()
+        urls, options, status, created_at, updated_at, owner_pid, heartbeat, cancel_requested = row
+        return {
+            'run_id': run_id,
+            'urls': json.loads(urls) if urls else None,
+            'options': json.loads(options) if options else {},
+            'status': status,
+            'created_at': created_at,
+            'updated_at': updated_at,
+            'owner_pid': owner_pid,
+            'live': status in ACTIVE_STATUSES and heartbeat is not None and heartbeat >= time.time() - timeout,
+            'cancel_requested': bool(cancel_requested),
+            'completed': completed,
+            'successful': successful
+        }
+
+    def record(self, run_id, url, result, index=None):
+        """
+        Journal the result of one URL
+
+        Args:
+            run_id: Run identifier
+            url: Processed URL, as it appeared in the input
+            result: JSON-serializable result dict
+            index: Position of the URL in the run's input
+        """
+        self._connection().execute(
+            'INSERT OR REPLACE INTO entries (run_id, url, idx, success, result, completed_at) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (run_id, url, index, int(bool(result.get('success', False))), json.dumps(result), time.time())
+        )
+
+    def lookup(self, run_id, url):
+        """Get the journaled result for a URL, or None if it has not completed"""
+        row = self._connection().execute(
+            'SELECT result FROM entries WHERE run_id = ? AND url = ?', (run_id, url)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def completed(self, run_id):
+        """
+        Get every journaled result of a run
+
+        Returns:
+            dict: url -> (index, result)
+        """
+        rows = self._connection().execute(
+            'SELECT url, idx, result FROM entries WHERE run_id = ?', (run_id,)
+        )
+        return {url: (index, json.loads(result)) for url, index, result in rows}
+
+    def prune(self, max_age=CHECKPOINT_RETENTION):
+        """
+        Delete runs (and their entries) with no activity for max_age seconds
+
+        Activity is a status change, a heartbeat or a journaled result, so a run
+        that is still making progress is never pruned.
+
+        Returns:
+            int: Number of runs deleted
+        """
+        cutoff = time.time() - max_age
+        conn = self._connection()
+        stale = [row[0] for row in conn.execute(
+            'SELECT run_id FROM runs WHERE MAX(updated_at, COALESCE(heartbeat, 0)) < ? AND NOT EXISTS '
+            '(SELECT 1 FROM entries WHERE entries.run_id = runs.run_id AND completed_at >= ?)',
+            (cutoff, cutoff)
+        )]
+        for run_id in stale:
+            conn.execute('DELETE FROM entries WHERE run_id = ?', (run_id,))
+            conn.execute('DELETE FROM runs WHERE run_id = ?', (run_id,))
+        if stale:
+            logger.info(f"Pruned {len(stale)} checkpoint runs older than {max_age:.0f}s")
+        return len(stale)
+
+    def close(self):
+        """Forget open connections, e.g. after forking a worker process"""
+        self._local = threading.local()
+
+# Process-wide journal used by background jobs
+journal = CheckpointJournal()
@@ -0,0 +1,284 @@
+"""
+Persistent HTTP Response Cache
+
+This module keeps downloaded pages on disk so they survive restarts:
+1. A single SQLite file shared by every worker process (WAL mode)
+2. zlib-compressed bodies stored next to the response headers
+3. ETag/Last-Modified validators kept per URL for conditional revalidation
+4. A freshness window inside which pages are served without touching the network
+5. Stored extraction results, so unchanged pages need not be parsed again
+
+Set SCRAPER_DISK_CACHE to a file path to move the cache, or to an empty string to
+disable it.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# SQLite file holding cached responses ('' disables the disk cache)
+DISK_CACHE_PATH = os.environ.get(
+    'SCRAPER_DISK_CACHE', os.path.join(tempfile.gettempdir(), 'scraper-cache.sqlite')
+)
+
+# Seconds a stored response is served without revalidation
+DISK_CACHE_TTL = float(os.environ.get('SCRAPER_DISK_CACHE_TTL', str(24 * 60 * 60)))
+
+# Responses not refreshed for this many seconds are deleted
+DISK_CACHE_MAX_AGE = float(os.environ.get('SCRAPER_DISK_CACHE_MAX_AGE', str(30 * 24 * 60 * 60)))
+
+# Prune expired rows after this many writes
+PRUNE_INTERVAL = 500
+
+class DiskCache:
+    """
+    SQLite-backed response cache safe to share between threads and processes
+
+    Every thread gets its own connection; SQLite's locking keeps writers from
+    different gunicorn workers consistent. Database errors are logged and treated
+    as cache misses so a broken cache file never breaks scraping.
+    """
+
+    def __init__(self, path=DISK_CACHE_PATH, ttl=DISK_CACHE_TTL, max_age=DISK_CACHE_MAX_AGE):
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def _connection(self):
+        """Get this thread's connection, creating the schema on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'url TEXT PRIMARY KEY, final_url TEXT, status_code INTEGER, '
+                'headers TEXT, body BLOB, etag TEXT, last_modified TEXT, '
+                'fetched_at REAL NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, result TEXT NOT NULL, stored_at REAL NOT NULL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def lookup(self, url):
+        """
+        Get the stored response for a URL, fresh or not
+
+        Args:
+            url: Requested URL
+
+        Returns:
+            dict: final_url, status_code, headers, content, etag, last_modified,
+                  fetched_at and fresh, or None if nothing is stored
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            row = self._connection().execute(
+                'SELECT final_url, status_code, headers, body, etag, last_modified, fetched_at '
+                'FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache lookup failed for {url}: {str(e)}")
+            return None
+
+        if row is None:
+            self._count('misses')
+            return None
+
+        final_url, status_code, headers, body, etag, last_modified, fetched_at = row
+        try:
+            content = zlib.decompress(body)
+        except zlib.error as e:
+            logger.warning(f"Discarding corrupt disk cache entry for {url}: {str(e)}")
+            self.delete(url)
+            self._count('misses')
+            return None
+
+        fresh = time.time() - fetched_at < self.ttl
+        self._count('hits' if fresh else 'misses')
+        return {
+            'final_url': final_url,
+            'status_code': status_code,
+            'headers': json.loads(headers),
+            'content': content,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': fetched_at,
+            'fresh': fresh
+        }
+
+    def store(self, url, content, headers, final_url=None, status_code=200):
+        """
+        Save a response, replacing any previous one for the URL
+
+        Args:
+            url: Requested URL
+            content: Raw body bytes
+            headers: Response headers
+            final_url: URL after redirects
+            status_code: HTTP status code
+        """
+        if not self.enabled:
+            return
+
+        headers = dict(headers)
+        if 'no-store' in headers.get('Cache-Control', '').lower():
+            return
+
+        try:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO responses '
+                '(url, final_url, status_code, headers, body, etag, last_modified, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    url, final_url or url, status_code, json.dumps(headers),
+                    zlib.compress(content), headers.get('ETag'), headers.get('Last-Modified'),
+                    time.time()
+                )
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache write failed for {url}: {str(e)}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_INTERVAL == 0
+        if prune:
+            self.prune()
+
+    def touch(self, url):
+        """Mark a stored response as just revalidated (after a 304)"""
+        if not self.enabled:
+            return
+
+        self._count('revalidations')
+        try:
+            self._connection().execute(
+                'UPDATE responses SET fetched_at = ? WHERE url = ?', (time.time(), url)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache update failed for {url}: {str(e)}")
+
+    def delete(self, url):
+        """Remove the stored response for a URL"""
+        if not self.enabled:
+            return
+
+        try:
+            self._connection().execute('DELETE FROM responses WHERE url = ?', (url,))
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache delete failed for {url}: {str(e)}")
+
+    def lookup_result(self, key):
+        """
+        Get a stored extraction result
+
+        Args:
+            key: Result key (see store_result)
+
+        Returns:
+            dict: The stored result, or None if there is none
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            row = self._connection().execute(
+                'SELECT result FROM results WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache result lookup failed for {key}: {str(e)}")
+            return None
+
+        return json.loads(row[0]) if row else None
+
+    def store_result(self, key, result):
+        """
+        Save an extraction result
+
+        Args:
+            key: Result key, e.g. the scraped URL
+            result: JSON-serializable result dict
+        """
+        if not self.enabled:
+            return
+
+        try:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO results (key, result, stored_at) VALUES (?, ?, ?)',
+                (key, json.dumps(result), time.time())
+            )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Disk cache result write failed for {key}: {str(e)}")
+
+    def prune(self):
+        """Delete responses and results that have not been refreshed within max_age"""
+        if not self.enabled:
+            return
+
+        cutoff = time.time() - self.max_age
+        try:
+            conn = self._connection()
+            cursor = conn.execute('DELETE FROM responses WHERE fetched_at < ?', (cutoff,))
+            conn.execute('DELETE FROM results WHERE stored_at < ?', (cutoff,))
+            if cursor.rowcount:
+                logger.info(f"Pruned {cursor.rowcount} expired disk cache entries")
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache prune failed: {str(e)}")
+
+    def close(self):
+        """Forget open connections, e.g. after forking a worker process"""
+        self._local = threading.local()
+
+    def stats(self):
+        """
+        Get cache counters and size
+
+        Returns:
+            dict: entries, compressed bytes, hits, misses and revalidations
+        """
+        stats = {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations
+        }
+        if self.enabled:
+            try:
+                entries, size = self._connection().execute(
+                    'SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses'
+                ).fetchone()
+                stats.update({'entries': entries, 'bytes': size})
+            except sqlite3.Error as e:
+                logger.warning(f"Disk cache stats failed: {str(e)}")
+        return stats
+
+# Process-wide response cache used by the HTTP client
+cache = DiskCache()
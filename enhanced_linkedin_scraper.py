@@ -11,9 +11,19 @@ import os
 import time
 import random
 import json
+import copy
 import requests
-from bs4 import BeautifulSoup
+from html_parsing import make_soup
 from urllib.parse import urlparse
+from http_client import fetch, new_session, read_page, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_TTL
+from ttl_cache import TTLCache
+from singleflight import SingleFlight
+from url_utils import canonical_key
+from section_utils import parse_sections
+import disk_cache
+import rate_limiter
+from functools import partial
+from fetch_engine import FetchEngine, run_parallel
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -50,11 +60,18 @@ REFERRERS = [
     'https://www.linkedin.com/in/'
 ]
 
-# Cache to prevent repeated requests for the same URL
-CACHE = {}
+# Bounded, expiring cache to prevent repeated requests for the same URL
+CACHE = TTLCache(max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL)
 
-# Flag to track if LinkedIn is blocking us
-LINKEDIN_BLOCKING = False
+# Concurrent extract_all_company_data calls for the same company share one run
+COMPANY_FLIGHTS = SingleFlight('extract_all_company_data')
+
+# Concurrent fetches of the same page (e.g. sections falling back to the main
+# company page) share one request
+PAGE_FLIGHTS = SingleFlight('fetch_linkedin_page')
+
+# Any LinkedIn URL; blocking state is tracked per host (see rate_limiter.blocks)
+LINKEDIN_HOME = 'https://www.linkedin.com/'
 
 def get_random_user_agent():
     """Get a random user agent to avoid detection"""
@@ -75,10 +92,8 @@ def setup_session():
     Returns:
         requests.Session: Session with anti-detection headers
     """
-    global LINKEDIN_BLOCKING
-    
-    # Create a session to maintain cookies
-    session = requests.Session()
+    # Create a session to maintain cookies; connections come from the shared pools
+    session = new_session()
     
     # Set headers to mimic a browser with randomized parameters
     session.headers.update({
@@ -103,8 +118,8 @@ def setup_session():
     session.cookies.set('lidc', f"b=VB{random.randint(10000, 99999)}:g=A:s=A:t={int(time.time())}", 
                       domain='.linkedin.com', path='/', expires=year_from_now)
     
-    # If LinkedIn started blocking us, add some extra protection
-    if LINKEDIN_BLOCKING:
+    # If LinkedIn blocked us recently, add some extra protection
+    if rate_limiter.blocks.is_blocked(LINKEDIN_HOME):
         logger.info("LinkedIn blocking detected - adding extra protection measures")
         
         # Add a Cloudflare bypass cookie
@@ -121,24 +136,17 @@ def setup_session():
     
     return session
 
-def apply_delay():
-    """Apply a random delay between requests to appear human-like"""
-    # Shorter delay if LinkedIn is already blocking (don't waste time)
-    if LINKEDIN_BLOCKING:
-        delay = 0.2 + (random.random() * 0.3)  # 0.2-0.5 seconds
-    else:
-        delay = 1 + (random.random() * 2)  # 1-3 seconds
-    
-    try:
-        time.sleep(delay)
-    except (KeyboardInterrupt, SystemExit):
-        logger.warning("Sleep interrupted")
-        pass
+def store_cached_page(url, html_content):
+    """Keep a fetched LinkedIn page in the memory and disk caches"""
+    CACHE.set(url, html_content)
+    disk_cache.cache.store(url, html_content.encode('utf-8'), {'Content-Type': 'text/html; charset=utf-8'})
 
 def fetch_linkedin_page(url, use_auth=True, use_cache=True):
     """
     Fetch a LinkedIn page using all anti-detection techniques
     
+    Concurrent calls for the same canonical URL share one request.
+    
     Args:
         url: LinkedIn URL to fetch
         use_auth: Whether to use authentication (not fully implemented)
@@ -147,14 +155,26 @@ def fetch_linkedin_page(url, use_auth=True, use_cache=True):
     Returns:
         tuple: (html_content, authenticated_status)
     """
-    global LINKEDIN_BLOCKING, CACHE
-    
+    key = (canonical_key(url), use_auth, use_cache)
+    return PAGE_FLIGHTS.do(key, _fetch_linkedin_page, url, use_auth, use_cache)
+
+def _fetch_linkedin_page(url, use_auth, use_cache):
+    """Fetch a LinkedIn page without sharing the request (see fetch_linkedin_page)"""
     # Check if this URL is in the cache
-    if use_cache and url in CACHE:
-        logger.info(f"Using cached response for: {url}")
-        return CACHE[url], False
-    
-    # Create a new session for each request
+    if use_cache:
+        cached_html = CACHE.get(url)
+        if cached_html is not None:
+            logger.info(f"Using cached response for: {url}")
+            return cached_html, False
+
+        entry = disk_cache.cache.lookup(url)
+        if entry and entry['fresh']:
+            logger.info(f"Using disk cached response for: {url}")
+            cached_html = entry['content'].decode('utf-8', errors='replace')
+            CACHE.set(url, cached_html)
+            return cached_html, False
+    
+    # Create a new fingerprint for each request (sockets are still reused)
     session = setup_session()
     authenticated = False  # Currently always assume unauthenticated
     
@@ -165,21 +185,20 @@ def fetch_linkedin_page(url, use_auth=True, use_cache=True):
         'Referer': base_url if random.random() > 0.5 else get_random_referrer()
     })
     
-    # Apply delay to appear more human-like
-    apply_delay()
-    
     try:
         # Fetch the requested URL with appropriate timeout
         logger.info(f"Fetching LinkedIn page: {url}")
         
-        # Try to fetch the page
-        response = session.get(url, timeout=10, allow_redirects=True)
+        # Try to fetch the page (waits for LinkedIn's rate limit bucket)
+        # Bodies are streamed so the page size limits apply (see http_client.read_page)
+        response = fetch(url, session=session, timeout=10, stream=True)
         status_code = response.status_code
         
-        # Check for blocking status codes
+        # Check for blocking status codes (fetch already recorded the block, which
+        # slows our LinkedIn rate and hardens new sessions until it decays)
         if status_code == 999 or status_code == 403:
             # LinkedIn has detected us as a bot
-            LINKEDIN_BLOCKING = True
+            response.close()
             logger.warning(f"LinkedIn blocking detected! Status code: {status_code}")
             
             # Attempt to fetch through a different method - fetch the Google cached version
@@ -196,17 +215,21 @@ def fetch_linkedin_page(url, use_auth=True, use_cache=True):
                     'Referer': 'https://www.google.com/search',
                 })
                 
-                cache_response = cache_session.get(google_cache_url, timeout=15)
+                cache_response = fetch(google_cache_url, session=cache_session, timeout=15, stream=True)
                 
-                if cache_response.status_code == 200:
-                    logger.info("Successfully retrieved content from Google cache")
-                    html_content = cache_response.text
-                    
-                    # Store in cache
-                    if use_cache:
-                        CACHE[url] = html_content
-                    
-                    return html_content, False
+                if cache_response.status_code != 200:
+                    cache_response.close()
+                else:
+                    page = read_page(cache_response)
+                    if page is not None:
+                        logger.info("Successfully retrieved content from Google cache")
+                        html_content = page['text']
+                        
+                        # Store in cache
+                        if use_cache:
+                            store_cached_page(url, html_content)
+                        
+                        return html_content, False
             
             except Exception as e:
                 logger.error(f"Failed to fetch from Google cache: {str(e)}")
@@ -216,7 +239,10 @@ def fetch_linkedin_page(url, use_auth=True, use_cache=True):
         
         # Handle normal response
         elif status_code == 200:
-            html_content = response.text
+            page = read_page(response)
+            if page is None:
+                return None, False
+            html_content = page['text']
             
             # Check for login redirects
             if 'uas/login' in response.url:
@@ -225,11 +251,12 @@ def fetch_linkedin_page(url, use_auth=True, use_cache=True):
             
             # Store in cache
             if use_cache:
-                CACHE[url] = html_content
+                store_cached_page(url, html_content)
             
             return html_content, authenticated
         
         else:
+            response.close()
             logger.warning(f"Unexpected status code: {status_code}")
             return None, False
     
@@ -280,7 +307,7 @@ def extract_company_about(linkedin_url):
         }
     
     # Parse with BeautifulSoup
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = make_soup(html_content)
     
     # Extract basic company information
     company_data = {
@@ -443,7 +470,7 @@ def extract_company_posts(linkedin_url):
         return posts_data
     
     # Try to parse with BeautifulSoup
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = make_soup(html_content)
     
     # Check if we were redirected to login
     if 'uas/login' in str(html_content).lower() or soup.find('form', attrs={'action': re.compile(r'.*login.*')}):
@@ -579,7 +606,7 @@ def extract_company_jobs(linkedin_url):
         return jobs_data
     
     # Try to parse with BeautifulSoup
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = make_soup(html_content)
     
     # Check if we were redirected to login
     if 'uas/login' in str(html_content).lower() or soup.find('form', attrs={'action': re.compile(r'.*login.*')}):
@@ -721,7 +748,7 @@ def extract_company_people(linkedin_url):
         return people_data
     
     # Try to parse with BeautifulSoup
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = make_soup(html_content)
     
     # Check if we were redirected to login
     if 'uas/login' in str(html_content).lower() or soup.find('form', attrs={'action': re.compile(r'.*login.*')}):
@@ -732,7 +759,7 @@ def extract_company_people(linkedin_url):
         main_html, _ = fetch_linkedin_page(main_url)
         
         if main_html:
-            main_soup = BeautifulSoup(main_html, 'html.parser')
+            main_soup = make_soup(main_html)
             
             # Look for employee count
             count_elem = main_soup.find(['span', 'div'], string=re.compile(r'(\d+)\s*(employees?|staff|people|professionals)', re.I))
@@ -835,16 +862,57 @@ def extract_company_people(linkedin_url):
     logger.info(f"Extracted {len(people_data['leadership'])} leadership and {len(people_data['employees'])} employees from LinkedIn")
     return people_data
 
-def extract_all_company_data(linkedin_url):
+# Section name -> extractor, in the order sections appear in the combined result
+SECTION_EXTRACTORS = {
+    'about': extract_company_about,
+    'posts': extract_company_posts,
+    'jobs': extract_company_jobs,
+    'people': extract_company_people
+}
+
+async def extract_company_section_async(section, linkedin_url, engine=None):
+    """
+    Async variant of the extract_company_* functions
+    
+    Args:
+        section: One of SECTION_EXTRACTORS ('about', 'posts', 'jobs', 'people')
+        linkedin_url: LinkedIn company profile URL
+        engine: FetchEngine to run on (a new one is created if omitted)
+        
+    Returns:
+        dict: Same result as the matching extract_company_* function
+    """
+    engine = engine or FetchEngine()
+    return await engine.run(linkedin_url, SECTION_EXTRACTORS[section], linkedin_url)
+
+def extract_all_company_data(linkedin_url, sections=None):
     """
     Extract all company data from LinkedIn
     
+    The requested sections are fetched and parsed concurrently.
+    
     Args:
         linkedin_url: LinkedIn company profile URL
+        sections: Sections to extract, any of 'about', 'posts', 'jobs', 'people', as a
+                  list or comma-separated string (default all)
         
     Returns:
         dict: Complete company data including about, posts, jobs, and people
     """
+    try:
+        sections = parse_sections(sections, SECTION_EXTRACTORS)
+    except ValueError as e:
+        logger.warning(f"Invalid LinkedIn sections requested: {str(e)}")
+        return {
+            'error': str(e)
+        }
+    
+    # Concurrent requests for the same company and sections share one extraction
+    key = (canonical_key(linkedin_url), tuple(sorted(sections)))
+    return copy.deepcopy(COMPANY_FLIGHTS.do(key, _extract_company_data, linkedin_url, sections))
+
+def _extract_company_data(linkedin_url, sections):
+    """Validate the URL and extract the requested sections (see extract_all_company_data)"""
     # Normalize URL format
     if not linkedin_url.startswith(('http://', 'https://')):
         linkedin_url = 'https://' + linkedin_url
@@ -878,20 +946,17 @@ def extract_all_company_data(linkedin_url):
     # Ensure URL is standardized
     linkedin_url = re.sub(r'(/company/[^/]+).*$', r'\1/', linkedin_url)
     
-    # Extract different types of data
-    about_data = extract_company_about(linkedin_url)
-    posts_data = extract_company_posts(linkedin_url)
-    jobs_data = extract_company_jobs(linkedin_url)
-    people_data = extract_company_people(linkedin_url)
+    # Extract the requested sections concurrently
+    section_data = run_parallel({
+        section: partial(SECTION_EXTRACTORS[section], linkedin_url)
+        for section in SECTION_EXTRACTORS if section in sections
+    })
     
     # Combine all data
     company_data = {
-        'company_url': linkedin_url,
-        'about': about_data,
-        'posts': posts_data,
-        'jobs': jobs_data,
-        'people': people_data
+        'company_url': linkedin_url
     }
+    company_data.update(section_data)
     
     logger.info(f"Completed full extraction for: {linkedin_url}")
     return company_data
\ No newline at end of file
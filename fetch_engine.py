@@ -0,0 +1,341 @@
+"""
+Async Fetch Engine
+
+This module runs scraper work concurrently on an asyncio event loop:
+1. A global limit on how many fetches run at the same time
+2. A per-host semaphore so a single site (LinkedIn in particular) is never flooded
+3. Sync wrappers so Flask views and CLI code can use it without being async
+4. A sync iterator that yields results as they complete, for streaming responses
+
+Network I/O goes through the pooled client in http_client, executed on a shared
+bounded thread pool, so sockets are reused across all concurrent tasks.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import http_client
+from rate_limiter import host_key
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Maximum number of fetches in flight across all hosts
+MAX_CONCURRENCY = int(os.environ.get('SCRAPER_MAX_CONCURRENCY', '16'))
+
+# Maximum number of fetches in flight against a single host
+PER_HOST_CONCURRENCY = int(os.environ.get('SCRAPER_PER_HOST_CONCURRENCY', '4'))
+
+# LinkedIn gets a tighter per-host limit to stay polite; it matches the LinkedIn
+# burst so one profile's sections are not queued behind each other
+LINKEDIN_CONCURRENCY = int(os.environ.get('SCRAPER_LINKEDIN_CONCURRENCY', '4'))
+
+# Seconds between admission checks while as_completed waits on its consumer
+ADMIT_POLL_INTERVAL = 0.05
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """
+    Get the shared worker pool that runs blocking fetch and parse calls
+
+    Returns:
+        ThreadPoolExecutor: Process-wide executor sized to MAX_CONCURRENCY
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix='fetch')
+        return _executor
+
+def set_executor_size(max_workers):
+    """
+    Replace the shared worker pool with one of a different size
+
+    The pool caps how many blocking calls run at once for every engine in the
+    process, so an engine with a max_concurrency above MAX_CONCURRENCY needs a
+    larger pool.
+
+    Args:
+        max_workers: Number of pool threads
+    """
+    global _executor
+
+    with _executor_lock:
+        previous, _executor = _executor, ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+    if previous is not None:
+        # Calls already running on the old pool finish there
+        previous.shutdown(wait=False)
+
+def reset():
+    """Forget the shared worker pool, e.g. after forking a worker process"""
+    global _executor
+
+    with _executor_lock:
+        # The parent's pool threads do not exist in a forked child; a new pool
+        # is created on next use
+        _executor = None
+
+class FetchEngine:
+    """
+    Bounded concurrency engine for one event loop
+
+    Tasks first wait for their host's semaphore and only then take a global slot,
+    so requests queued behind a busy host never block other hosts.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, per_host_concurrency=PER_HOST_CONCURRENCY, host_limits=None):
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.host_limits = {'linkedin.com': LINKEDIN_CONCURRENCY}
+        self.host_limits.update(host_limits or {})
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._hosts = {}
+
+    def _host_semaphore(self, host):
+        """Get (or create) the semaphore limiting one host"""
+        if host not in self._hosts:
+            limit = self.host_limits.get(host, self.per_host_concurrency)
+            self._hosts[host] = asyncio.Semaphore(limit)
+        return self._hosts[host]
+
+    async def run(self, url, func, *args, **kwargs):
+        """
+        Run a blocking call for a URL under the global and per-host limits
+
+        Args:
+            url: URL that decides which host limit applies
+            func: Blocking function to execute
+            *args, **kwargs: Arguments for func
+
+        Returns:
+            Whatever func returns
+        """
+        async with self._host_semaphore(host_key(url)):
+            async with self._global:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+    async def fetch_page(self, url, **kwargs):
+        """Fetch a page through the shared pools (see http_client.fetch_page)"""
+        return await self.run(url, http_client.fetch_page, url, **kwargs)
+
+    async def map(self, func, urls, return_exceptions=True):
+        """
+        Apply func to every URL concurrently
+
+        Args:
+            func: Blocking function taking a URL
+            urls: URLs to process
+            return_exceptions: Return exceptions in place of results instead of raising
+
+        Returns:
+            list: Results in the same order as urls
+        """
+        tasks = [self.run(url, func, url) for url in urls]
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+
+    async def as_completed(self, func, urls, max_pending=None, admit=None):
+        """
+        Apply func to every URL concurrently, yielding results as they finish
+
+        Args:
+            func: Blocking function taking a URL
+            urls: URLs to process (any iterable; it is consumed lazily)
+            max_pending: Maximum number of URLs taken from urls but not yet yielded
+                         (None schedules them all at once)
+            admit: Optional callable taking a URL's index; a URL is only started
+                   once it returns True (e.g. to bound a consumer's reorder buffer)
+
+        Yields:
+            tuple: (index, url, result_or_exception) in completion order
+        """
+        async def indexed(index, url):
+            try:
+                return index, url, await self.run(url, func, url)
+            except Exception as e:
+                return index, url, e
+
+        url_iter = enumerate(urls)
+        pending = set()
+        exhausted = False
+        held = None
+        try:
+            while True:
+                while not exhausted and (max_pending is None or len(pending) < max_pending):
+                    if held is None:
+                        try:
+                            held = next(url_iter)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                    if admit is not None and not admit(held[0]):
+                        break
+                    index, url = held
+                    held = None
+                    pending.add(asyncio.ensure_future(indexed(index, url)))
+
+                if not pending:
+                    if held is None:
+                        break
+                    # Nothing in flight: wait for the consumer to admit the next URL
+                    await asyncio.sleep(ADMIT_POLL_INTERVAL)
+                    continue
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+def run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code
+
+    Uses a private event loop in a helper thread if the caller is already inside one.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result = {}
+
+    def runner():
+        try:
+            result['value'] = asyncio.run(coro)
+        except BaseException as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if 'error' in result:
+        raise result['error']
+    return result['value']
+
+def map_concurrent(func, urls, **engine_options):
+    """
+    Sync wrapper: apply func to every URL with bounded concurrency
+
+    Args:
+        func: Blocking function taking a URL
+        urls: URLs to process
+        **engine_options: FetchEngine keyword arguments
+
+    Returns:
+        list: Results (or exceptions) in the same order as urls
+    """
+    async def runner():
+        engine = FetchEngine(**engine_options)
+        return await engine.map(func, urls)
+
+    return run_sync(runner())
+
+def iter_completed(func, urls, max_pending=None, admit=None, **engine_options):
+    """
+    Sync wrapper: apply func to every URL, yielding results as they finish
+
+    The engine runs on a private event loop in a helper thread and hands results
+    over through a small bounded queue, so at most a few finished results are held
+    in memory at once. Closing the iterator early stops the remaining work.
+
+    Args:
+        func: Blocking function taking a URL
+        urls: URLs to process (any iterable; it is consumed lazily)
+        max_pending: Maximum number of URLs in flight (see FetchEngine.as_completed)
+        admit: Optional admission check per URL index (see FetchEngine.as_completed)
+        **engine_options: FetchEngine keyword arguments
+
+    Yields:
+        tuple: (index, url, result_or_exception) in completion order
+    """
+    results = queue.Queue(maxsize=max(1, engine_options.get('max_concurrency', MAX_CONCURRENCY)))
+    stop = threading.Event()
+    done = object()
+    failure = {}
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    async def producer():
+        engine = FetchEngine(**engine_options)
+        async for item in engine.as_completed(func, urls, max_pending=max_pending, admit=admit):
+            if not await asyncio.to_thread(put, item):
+                break
+
+    def runner():
+        try:
+            asyncio.run(producer())
+        except BaseException as e:
+            failure['error'] = e
+        finally:
+            put(done)
+
+    thread = threading.Thread(target=runner, name='fetch-stream', daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = results.get()
+            if item is done:
+                break
+            yield item
+    finally:
+        stop.set()
+
+    if 'error' in failure:
+        raise failure['error']
+
+def fetch_pages(urls, **engine_options):
+    """
+    Sync wrapper: download many pages concurrently
+
+    Args:
+        urls: URLs to fetch
+        **engine_options: FetchEngine keyword arguments
+
+    Returns:
+        list: Page dicts (or None on failure) in the same order as urls
+    """
+    pages = map_concurrent(http_client.fetch_page, urls, **engine_options)
+    return [None if isinstance(page, Exception) else page for page in pages]
+
+def run_parallel(calls):
+    """
+    Run a few independent blocking calls at the same time
+
+    Uses a short-lived pool of its own rather than the shared executor, so it is
+    safe to call from code that is itself running on the engine's workers.
+
+    Args:
+        calls: dict mapping a name to a zero-argument callable
+
+    Returns:
+        dict: name -> result, in the same key order as calls
+    """
+    if not calls:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix='section') as pool:
+        futures = {name: pool.submit(call) for name, call in calls.items()}
+        return {name: future.result() for name, future in futures.items()}
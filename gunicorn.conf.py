@@ -0,0 +1,118 @@
+"""
+Gunicorn Configuration
+
+Shared by the Procfile, Elastic Beanstalk, App Engine and the start scripts:
+1. Threaded (gthread) workers, so one slow LinkedIn fetch no longer blocks every
+   other request in the worker
+2. Worker count from the CPU count (or WEB_CONCURRENCY)
+3. The app is loaded once in the master and shared copy-on-write (preload_app)
+4. Timeouts sized for multi-URL scrapes
+5. Workers are recycled after a number of requests to cap in-memory cache growth,
+   but never while they run background jobs
+6. Per-process state inherited from the master (connection pools, thread pools,
+   SQLite connections) is reset in every forked worker
+7. A worker that exits gives its background jobs a moment to finish and marks the
+   rest 'interrupted' in the checkpoint journal, ready to be resumed
+
+Every setting can be overridden with an environment variable, e.g.
+SCRAPER_WORKER_THREADS=16 gunicorn -c gunicorn.conf.py main:app
+"""
+
+import multiprocessing
+import os
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+def _env_flag(name, default):
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Worker processes: one per CPU (at least two so a restart never drops all capacity)
+workers = _env_int('WEB_CONCURRENCY', max(2, multiprocessing.cpu_count()))
+
+# Threads per worker. The scraper modules share their caches, pools and rate
+# limits safely between threads, so 'gthread' is the supported worker class
+# ('sync' needs SCRAPER_WORKER_THREADS=1, otherwise gunicorn switches to gthread).
+# Green-thread classes (gevent, eventlet) are rejected: the fetch engine, job
+# runners and SQLite connections rely on real threads.
+SUPPORTED_WORKER_CLASSES = ('gthread', 'sync')
+
+worker_class = os.environ.get('SCRAPER_WORKER_CLASS', 'gthread')
+if worker_class not in SUPPORTED_WORKER_CLASSES:
+    raise ValueError(
+        f"SCRAPER_WORKER_CLASS={worker_class!r} is not supported; use one of {', '.join(SUPPORTED_WORKER_CLASSES)}"
+    )
+threads = _env_int('SCRAPER_WORKER_THREADS', 8)
+
+# Load main:app (and, in when_ready, the scraper modules) once in the master
+preload_app = _env_flag('SCRAPER_PRELOAD_APP', 'true')
+
+# A batch of 20 URLs runs inside one request, so allow long requests
+timeout = _env_int('SCRAPER_WORKER_TIMEOUT', 120)
+graceful_timeout = _env_int('SCRAPER_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('SCRAPER_KEEPALIVE', 5)
+
+# Restart each worker after this many requests (jittered so they do not all
+# restart together); bounds memory held by the page and result caches. A worker
+# with background jobs in memory postpones its restart until they finish
+# (see pre_request).
+max_requests = _env_int('SCRAPER_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('SCRAPER_MAX_REQUESTS_JITTER', 100)
+
+# Seconds an exiting worker waits for its background jobs before interrupting
+# them; keep it below graceful_timeout
+job_drain_timeout = _env_int('SCRAPER_JOB_DRAIN_TIMEOUT', 20)
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('SCRAPER_LOG_LEVEL', 'info')
+
+def when_ready(server):
+    """Import the scraper modules in the master so workers share them"""
+    if server.cfg.preload_app:
+        import main
+        main.preload()
+        server.log.info("Preloaded scraper modules")
+
+def post_fork(server, worker):
+    """Drop state a worker must not share with the master or other workers"""
+    import checkpoint
+    import fetch_engine
+    import http_client
+    import jobs
+    import rate_limiter
+
+    # Pooled sockets, DNS cache and disk cache connections
+    http_client.reset()
+    # Thread pools: their threads were not copied by fork
+    fetch_engine.reset()
+    jobs.manager.reset()
+    # SQLite connections must never be used across a fork
+    checkpoint.journal.close()
+    # Rate limit buckets and block penalties (in-process copies and state file connections)
+    rate_limiter.limiter.reset()
+    rate_limiter.blocks.reset()
+
+    server.log.info(f"Worker {worker.pid} ready ({server.cfg.worker_class_str}, {server.cfg.threads} threads)")
+
+def pre_request(worker, req):
+    """Postpone the max_requests restart while this worker runs background jobs"""
+    if not max_requests:
+        return
+
+    import jobs
+
+    # The worker restarts once its request count reaches worker.max_requests
+    if jobs.manager.active_count() and worker.nr + 1 >= worker.max_requests:
+        worker.max_requests = worker.nr + 2
+
+def worker_exit(server, worker):
+    """Drain background jobs and mark the ones still running as interrupted"""
+    import jobs
+
+    interrupted = jobs.manager.shutdown(timeout=min(job_drain_timeout, graceful_timeout))
+    if interrupted:
+        server.log.warning(f"Worker {worker.pid} interrupted {interrupted} background jobs; "
+                           f"resume them with POST /api/jobs/<id>/resume")
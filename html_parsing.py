@@ -0,0 +1,91 @@
+"""
+HTML Parser Backends
+
+This module builds the BeautifulSoup trees used by every extractor:
+1. One place to choose the tree builder ('html.parser', 'lxml' or 'html5lib')
+2. The backend is set with SCRAPER_HTML_PARSER and can be changed at runtime
+3. Unavailable backends fall back to the built-in 'html.parser' with a warning
+
+'html.parser' stays the default because the extractors were written against its
+tree; check another backend with `python benchmarks.py parsers` before switching.
+'lxml' is the fast option and is installed with the project. 'html5lib' parses the
+way browsers do but is slower than 'html.parser'; it is only meant for checking
+extraction results on badly broken pages, not for speed.
+"""
+
+import importlib.util
+import logging
+import os
+from bs4 import BeautifulSoup
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Tree builders BeautifulSoup supports, and the module each one needs (html5lib is
+# not a dependency: install it separately for correctness checks)
+SUPPORTED_BACKENDS = {
+    'html.parser': None,
+    'lxml': 'lxml',
+    'html5lib': 'html5lib'
+}
+
+DEFAULT_BACKEND = 'html.parser'
+
+_backend = None
+_warned = set()
+
+def available_backends():
+    """
+    Get the backends that can be used in this environment
+
+    Returns:
+        list: Backend names whose parser library is installed
+    """
+    return [name for name, module in SUPPORTED_BACKENDS.items()
+            if module is None or importlib.util.find_spec(module) is not None]
+
+def _resolve(backend):
+    """Map a requested backend to one that is installed"""
+    if backend in available_backends():
+        return backend
+
+    if backend not in _warned:
+        _warned.add(backend)
+        logger.warning(f"HTML parser backend '{backend}' is not available, using '{DEFAULT_BACKEND}'")
+    return DEFAULT_BACKEND
+
+def get_backend():
+    """Get the backend used when make_soup is called without one"""
+    global _backend
+
+    if _backend is None:
+        _backend = _resolve(os.environ.get('SCRAPER_HTML_PARSER', DEFAULT_BACKEND))
+    return _backend
+
+def set_backend(backend):
+    """
+    Change the default backend for this process
+
+    Args:
+        backend: 'html.parser', 'lxml' or 'html5lib'
+
+    Returns:
+        str: The backend actually in use (after any fallback)
+    """
+    global _backend
+
+    _backend = _resolve(backend)
+    return _backend
+
+def make_soup(markup, backend=None):
+    """
+    Parse HTML with the configured backend
+
+    Args:
+        markup: HTML string or bytes
+        backend: Backend for this call only (defaults to get_backend())
+
+    Returns:
+        BeautifulSoup: Parsed document
+    """
+    return BeautifulSoup(markup, _resolve(backend) if backend else get_backend())
@@ -0,0 +1,433 @@
+"""
+Shared HTTP Client
+
+This module provides the pooled HTTP layer used by every scraper module:
+1. Keep-alive connection pools per host, shared by all sessions in the process
+2. Configurable pool sizes through environment variables
+3. A small TTL cache in front of DNS lookups (opt-in, see install_dns_cache)
+4. TLS session reuse through persistent pooled connections
+5. Per-host token-bucket rate limiting that backs off from blocking hosts (see rate_limiter)
+6. A bounded in-memory page cache (see ttl_cache)
+7. A persistent on-disk response cache with conditional revalidation (see disk_cache)
+8. Coalescing of concurrent downloads of the same canonical URL (see singleflight)
+9. Size-capped streaming page reads that skip non-HTML responses
+"""
+
+import logging
+import os
+import re
+import socket
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+import disk_cache
+import rate_limiter
+from ttl_cache import TTLCache
+from singleflight import SingleFlight
+from url_utils import canonical_key
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Number of per-host connection pools kept alive in the process
+POOL_CONNECTIONS = int(os.environ.get('SCRAPER_POOL_CONNECTIONS', '32'))
+
+# Maximum number of idle keep-alive connections kept per host
+POOL_MAXSIZE = int(os.environ.get('SCRAPER_POOL_MAXSIZE', '10'))
+
+# Seconds a resolved address is reused before asking DNS again (0 disables the cache)
+DNS_CACHE_TTL = float(os.environ.get('SCRAPER_DNS_CACHE_TTL', '300'))
+
+# Upper bound on cached DNS answers before the cache is cleared
+DNS_CACHE_MAX_ENTRIES = 1024
+
+# Default timeout for page downloads, in seconds
+DEFAULT_TIMEOUT = 10
+
+# Bounds for in-memory page caches
+CACHE_MAX_ENTRIES = int(os.environ.get('SCRAPER_CACHE_MAX_ENTRIES', '512'))
+CACHE_MAX_BYTES = int(os.environ.get('SCRAPER_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+CACHE_TTL = float(os.environ.get('SCRAPER_CACHE_TTL', '600'))
+
+# Largest page body read by fetch_page; longer pages are cut off and marked truncated
+MAX_PAGE_BYTES = int(os.environ.get('SCRAPER_MAX_PAGE_BYTES', str(5 * 1024 * 1024)))
+
+# Bytes read after </head> before fetch_page stops downloading (0 reads the whole page)
+HEAD_TAIL_BYTES = int(os.environ.get('SCRAPER_HEAD_TAIL_BYTES', '0'))
+
+# Size of each streamed read
+READ_CHUNK_SIZE = 64 * 1024
+
+# Content types that are always parsed as HTML
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Content types (or none at all) whose body is sniffed before it is treated as HTML
+SNIFFED_CONTENT_TYPES = ('', 'text/plain', 'application/octet-stream', 'application/xml', 'text/xml')
+
+# How an HTML document can start (after a byte order mark and whitespace)
+HTML_SIGNATURES = (b'<!doctype', b'<html', b'<head', b'<body', b'<meta', b'<title', b'<!--', b'<?xml')
+
+HEAD_END_PATTERN = re.compile(rb'</head\s*>', re.I)
+
+# Browser-like headers used for plain website fetches
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+        'AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/123.0.0.0 Safari/537.36'
+    ),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Connection': 'keep-alive'
+}
+
+_lock = threading.Lock()
+_adapter = None
+_session = None
+
+# Pages downloaded through fetch_page, keyed by canonical URL
+PAGE_CACHE = TTLCache(max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL)
+
+# Concurrent fetch_page calls for the same canonical URL share one download
+PAGE_FLIGHTS = SingleFlight('fetch_page')
+
+_dns_lock = threading.Lock()
+_dns_cache = {}
+_original_getaddrinfo = socket.getaddrinfo
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    """socket.getaddrinfo replacement that remembers answers for DNS_CACHE_TTL seconds"""
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+
+    with _dns_lock:
+        entry = _dns_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+
+    result = _original_getaddrinfo(host, port, family, type, proto, flags)
+
+    with _dns_lock:
+        if len(_dns_cache) >= DNS_CACHE_MAX_ENTRIES:
+            _dns_cache.clear()
+        _dns_cache[key] = (now + DNS_CACHE_TTL, result)
+
+    return result
+
+def install_dns_cache():
+    """
+    Route process-wide DNS lookups through the TTL cache
+
+    This replaces socket.getaddrinfo for the whole process, so it is opt-in: the
+    app entry points and the batch CLI call it at startup, importing this module
+    does not.
+    """
+    if DNS_CACHE_TTL > 0 and socket.getaddrinfo is not _cached_getaddrinfo:
+        socket.getaddrinfo = _cached_getaddrinfo
+        logger.debug(f"DNS cache installed with {DNS_CACHE_TTL}s TTL")
+
+def get_adapter():
+    """
+    Get the process-wide transport adapter
+
+    The adapter owns the urllib3 pool manager, so every session that mounts it
+    shares the same keep-alive sockets (and their TLS sessions) per host.
+
+    Returns:
+        HTTPAdapter: Shared pooled adapter
+    """
+    global _adapter
+
+    with _lock:
+        if _adapter is None:
+            _adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+            logger.debug(f"Created HTTP pool: {POOL_CONNECTIONS} hosts x {POOL_MAXSIZE} connections")
+        return _adapter
+
+def new_session():
+    """
+    Create a session with its own headers and cookies on top of the shared pools
+
+    Returns:
+        requests.Session: Session mounted on the shared adapter
+    """
+    session = requests.Session()
+    adapter = get_adapter()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def get_session():
+    """
+    Get the shared session used for plain website fetches
+
+    Returns:
+        requests.Session: Process-wide session with default browser headers
+    """
+    global _session
+
+    if _session is None:
+        session = new_session()
+        session.headers.update(DEFAULT_HEADERS)
+        with _lock:
+            if _session is None:
+                _session = session
+    return _session
+
+def reset():
+    """Drop pooled connections, e.g. after forking a worker process"""
+    global _adapter, _session
+
+    with _lock:
+        if _adapter is not None:
+            _adapter.close()
+        _adapter = None
+        _session = None
+
+    with _dns_lock:
+        _dns_cache.clear()
+
+    disk_cache.cache.close()
+
+def _charset_from_headers(headers):
+    """Get the charset declared in the Content-Type header, if any"""
+    content_type = headers.get('Content-Type', '')
+    match = re.search(r'charset=["\']?([\w.:-]+)', content_type, re.I)
+    return match.group(1) if match else None
+
+def fetch(url, headers=None, timeout=DEFAULT_TIMEOUT, session=None, rate_limit=True, **kwargs):
+    """
+    Issue a GET request over the shared connection pools
+
+    Args:
+        url: URL to fetch
+        headers: Extra headers for this request only
+        timeout: Request timeout in seconds
+        session: Session to use instead of the shared one
+        rate_limit: Wait for the host's token bucket before sending (default True)
+        **kwargs: Passed through to requests
+
+    Returns:
+        requests.Response: The response (exceptions propagate to the caller)
+    """
+    session = session or get_session()
+    if rate_limit:
+        rate_limiter.acquire(url)
+    kwargs.setdefault('allow_redirects', True)
+    response = session.get(url, headers=headers, timeout=timeout, **kwargs)
+    # 429s (and LinkedIn's 999/403) slow down later requests to the host
+    rate_limiter.blocks.observe(url, response.status_code)
+    return response
+
+def _html_content_type(headers):
+    """
+    Classify a response by its Content-Type header
+
+    Returns:
+        bool: True for HTML, False for anything else, None when the body must be sniffed
+    """
+    content_type = headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if content_type in HTML_CONTENT_TYPES:
+        return True
+    if content_type in SNIFFED_CONTENT_TYPES:
+        return None
+    return False
+
+def _looks_like_html(content):
+    """Check whether a body starts like an HTML document"""
+    start = content[:1024].lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    return start.startswith(HTML_SIGNATURES)
+
+def _read_body(response, max_bytes=MAX_PAGE_BYTES, head_tail=HEAD_TAIL_BYTES):
+    """
+    Read a streamed response body, stopping at the size limits
+
+    Args:
+        response: Response requested with stream=True (closed when done)
+        max_bytes: Maximum number of bytes to keep
+        head_tail: Stop this many bytes after </head> (0 to read the whole body)
+
+    Returns:
+        tuple: (body bytes, True if the body was cut short)
+    """
+    body = bytearray()
+    limit = max_bytes
+    head_found = not head_tail
+    truncated = False
+    try:
+        for chunk in response.iter_content(READ_CHUNK_SIZE):
+            searched = max(0, len(body) - 16)
+            body += chunk
+            if not head_found:
+                match = HEAD_END_PATTERN.search(body, searched)
+                if match:
+                    head_found = True
+                    limit = min(max_bytes, match.end() + head_tail)
+            if len(body) > limit:
+                del body[limit:]
+                truncated = True
+                break
+    finally:
+        response.close()
+    return bytes(body), truncated
+
+def _build_page(content, headers, url, status_code, truncated=False):
+    """Decode a response body into the page dict shared by all parsers"""
+    charset = _charset_from_headers(headers) or 'utf-8'
+    try:
+        text = content.decode(charset, errors='replace')
+    except LookupError:
+        # Unknown charset advertised by the server
+        text = content.decode('utf-8', errors='replace')
+
+    return {
+        'content': content,
+        'text': text,
+        'headers': dict(headers),
+        'url': url,
+        'status_code': status_code,
+        'truncated': truncated
+    }
+
+def read_page(response, max_bytes=MAX_PAGE_BYTES, head_tail=0):
+    """
+    Read an HTML response requested with stream=True, within the page size limits
+
+    Responses whose Content-Type is not HTML are closed without reading the body,
+    and bodies are cut at max_bytes (the page is then marked 'truncated').
+
+    Args:
+        response: Response requested with stream=True (closed when done)
+        max_bytes: Maximum number of bytes to read
+        head_tail: Stop this many bytes after </head> (0 to read the whole body)
+
+    Returns:
+        dict: Page with 'content', 'text', 'headers', 'url', 'status_code' and
+              'truncated', or None if the response is not HTML
+    """
+    is_html = _html_content_type(response.headers)
+    if is_html is False:
+        # Never download bodies we cannot parse (PDFs, images, JSON, ...)
+        response.close()
+        logger.warning(f"Skipping non-HTML response ({response.headers.get('Content-Type')}) for: {response.url}")
+        return None
+
+    content, truncated = _read_body(response, max_bytes, head_tail)
+
+    if is_html is None and not _looks_like_html(content):
+        logger.warning(f"Skipping response that does not look like HTML for: {response.url}")
+        return None
+
+    if truncated:
+        logger.warning(f"Page truncated after {len(content)} bytes: {response.url}")
+
+    return _build_page(content, response.headers, response.url, response.status_code, truncated)
+
+def _page_from_disk(entry):
+    """Rebuild a page dict from a disk cache entry"""
+    return _build_page(entry['content'], entry['headers'], entry['final_url'], entry['status_code'])
+
+def fetch_page(url, timeout=DEFAULT_TIMEOUT, headers=None, use_cache=True):
+    """
+    Download a page exactly once so every parser can share the same response
+
+    Lookups go memory cache -> fresh disk cache entry -> network. A stale disk
+    entry with an ETag or Last-Modified is revalidated with a conditional GET.
+    Spellings of the same URL (see url_utils.canonical_key) share cache entries,
+    and concurrent calls for one of them share a single download.
+
+    Args:
+        url: URL to fetch
+        timeout: Request timeout in seconds
+        headers: Extra headers for this request only
+        use_cache: Serve from and store into PAGE_CACHE and the disk cache (default True)
+
+    Returns:
+        dict: Raw body bytes, decoded text, response headers, final URL and status,
+              or None if the download failed or was not HTML. 'not_modified' is
+              True when the server answered 304 and the stored body was reused;
+              'truncated' is True when the body was cut off at MAX_PAGE_BYTES (or
+              HEAD_TAIL_BYTES after </head>).
+    """
+    if not use_cache:
+        return _load_page(url, None, timeout, headers)
+
+    key = canonical_key(url)
+    cached = PAGE_CACHE.get(key)
+    if cached is not None:
+        logger.debug(f"Using cached page for: {url}")
+        return dict(cached)
+
+    page = PAGE_FLIGHTS.do(key, _load_page, url, key, timeout, headers)
+    return dict(page) if page else None
+
+def _load_page(url, key, timeout, headers):
+    """Get a page from the disk cache or the network (key None bypasses the caches)"""
+    entry = None
+    if key is not None:
+        entry = disk_cache.cache.lookup(key)
+        if entry and entry['fresh']:
+            logger.debug(f"Using disk cached page for: {url}")
+            page = _page_from_disk(entry)
+            PAGE_CACHE.set(key, page)
+            return page
+
+    request_headers = dict(headers or {})
+    if entry:
+        if entry['etag']:
+            request_headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            request_headers['If-Modified-Since'] = entry['last_modified']
+
+    try:
+        response = fetch(url, headers=request_headers or None, timeout=timeout, stream=True)
+    except requests.RequestException as e:
+        logger.error(f"Error downloading {url}: {str(e)}")
+        return None
+
+    if response.status_code == 304 and entry:
+        response.close()
+        logger.debug(f"Not modified, reusing disk cached page for: {url}")
+        disk_cache.cache.touch(key)
+        page = _page_from_disk(entry)
+        PAGE_CACHE.set(key, page)
+        return dict(page, not_modified=True)
+
+    if not response.ok:
+        response.close()
+        logger.error(f"Error downloading {url}: HTTP {response.status_code}")
+        return None
+
+    try:
+        page = read_page(response, head_tail=HEAD_TAIL_BYTES)
+    except requests.RequestException as e:
+        logger.error(f"Error downloading {url}: {str(e)}")
+        return None
+
+    if page is None:
+        return None
+
+    if key is not None:
+        PAGE_CACHE.set(key, page)
+        # Truncated bodies are not persisted: the disk cache only holds complete pages
+        if not page['truncated']:
+            disk_cache.cache.store(key, page['content'], page['headers'], page['url'], page['status_code'])
+
+    return page
+
+def fetch_html(url, timeout=DEFAULT_TIMEOUT, use_cache=True):
+    """
+    Download a page and return only its decoded HTML
+
+    Drop-in replacement for trafilatura.fetch_url that goes through the shared pools.
+
+    Args:
+        url: URL to fetch
+        timeout: Request timeout in seconds
+        use_cache: Serve from and store into PAGE_CACHE and the disk cache (default True)
+
+    Returns:
+        str: Decoded HTML, or None if the download failed
+    """
+    page = fetch_page(url, timeout=timeout, use_cache=use_cache)
+    return page['text'] if page else None
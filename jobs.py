@@ -0,0 +1,409 @@
+"""
+Background Batch Jobs
+
+This module runs large batches outside the HTTP request that submitted them:
+1. Submitting a batch returns a job ID immediately
+2. A small pool of job runners processes queued jobs, each through the fetch engine
+   so global and per-host concurrency limits still apply; URLs that canonicalize
+   to the same site are fetched once and the result is recorded for each of them
+3. Progress and partial results can be polled while a job runs
+4. Finished jobs are kept for a retention period and then dropped
+5. Every finished URL is journaled (see checkpoint), so a job interrupted by a
+   restart or deploy can be resumed without refetching completed URLs
+
+Running jobs live in the memory of the process that accepted them; their
+journaled progress is visible to every process. The owning process sends a
+heartbeat for each of its jobs, so another process only resumes a job whose owner
+has stopped, and a cancel sent to another process is picked up by the owner.
+A process that shuts down (e.g. a recycled gunicorn worker) marks the jobs it
+could not finish as 'interrupted' so they can be resumed.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from fetch_engine import FetchEngine, run_sync
+from url_utils import dedupe_urls
+import checkpoint
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Maximum number of URLs accepted in one job
+MAX_JOB_URLS = int(os.environ.get('SCRAPER_MAX_JOB_URLS', '10000'))
+
+# Number of jobs processed at the same time (URLs inside a job run concurrently)
+JOB_WORKERS = int(os.environ.get('SCRAPER_JOB_WORKERS', '2'))
+
+# Seconds a finished job stays available for polling
+JOB_RETENTION = float(os.environ.get('SCRAPER_JOB_RETENTION', str(60 * 60)))
+
+# Seconds between heartbeats (and cancellation checks) for this process's jobs;
+# keep it well below SCRAPER_CHECKPOINT_HEARTBEAT_TIMEOUT
+HEARTBEAT_INTERVAL = float(os.environ.get('SCRAPER_JOB_HEARTBEAT_INTERVAL', '10'))
+
+# Seconds between prunes of old runs from the checkpoint journal
+PRUNE_INTERVAL = 60 * 60
+
+class Job:
+    """
+    State of one background batch
+
+    Results are stored in input order; entries are None until their URL finishes.
+    """
+
+    def __init__(self, urls, options=None, job_id=None):
+        self.id = job_id or uuid.uuid4().hex
+        self.urls = list(urls)
+        self.options = options or {}
+        self.status = 'queued'
+        self.results = [None] * len(self.urls)
+        self.completed = 0
+        self.successful = 0
+        self.failed = 0
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = False
+        self.interrupted = False
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status in ('completed', 'failed', 'cancelled')
+
+    def record(self, index, result):
+        """Store the result for the URL at index"""
+        with self._lock:
+            self.results[index] = result
+            self.completed += 1
+            if result.get('success', False):
+                self.successful += 1
+            else:
+                self.failed += 1
+
+    @property
+    def pending_indexes(self):
+        """Indexes of URLs without a result yet"""
+        with self._lock:
+            return [index for index, result in enumerate(self.results) if result is None]
+
+    def to_dict(self, include_results=True, offset=0, limit=None):
+        """
+        Get the job's progress as a JSON-serializable dict
+
+        Args:
+            include_results: Include (partial) results
+            offset: Index of the first result to include
+            limit: Maximum number of results to include (all if None)
+
+        Returns:
+            dict: Job status, counters, timestamps and optionally results
+        """
+        with self._lock:
+            data = {
+                'job_id': self.id,
+                'status': self.status,
+                'total': len(self.urls),
+                'completed': self.completed,
+                'successful': self.successful,
+                'failed': self.failed,
+                'progress': round(self.completed / len(self.urls), 4) if self.urls else 1.0,
+                'options': self.options,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at
+            }
+            if self.error:
+                data['error'] = self.error
+            if self.cancel_requested and not self.finished:
+                data['cancel_requested'] = True
+            if include_results:
+                end = None if limit is None else offset + limit
+                data['offset'] = offset
+                data['results'] = self.results[offset:end]
+        return data
+
+class JobManager:
+    """
+    Queue and runner pool for background batch jobs
+    """
+
+    def __init__(self, workers=JOB_WORKERS, retention=JOB_RETENTION, journal=checkpoint.journal):
+        self.workers = workers
+        self.retention = retention
+        self.journal = journal
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._heartbeat = None
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+            if self._heartbeat is None and self.journal.enabled:
+                self._heartbeat = threading.Thread(target=self._send_heartbeats, name='job-heartbeat', daemon=True)
+                self._heartbeat.start()
+            return self._pool
+
+    def _send_heartbeats(self):
+        """
+        Keep this process's unfinished jobs marked as alive in the journal
+
+        Also picks up cancellations requested through another process and prunes
+        old runs from the journal now and then.
+        """
+        thread = threading.current_thread()
+        last_prune = 0
+        while self._heartbeat is thread:
+            with self._lock:
+                active = {job_id: job for job_id, job in self._jobs.items() if not job.finished}
+            cancelled = self._checkpoint('heartbeat', list(active), os.getpid()) or set()
+            for job_id in cancelled:
+                if not active[job_id].cancel_requested:
+                    logger.info(f"Job {job_id} cancelled through another process")
+                    active[job_id].cancel_requested = True
+
+            if time.time() - last_prune > PRUNE_INTERVAL:
+                self._checkpoint('prune')
+                last_prune = time.time()
+            time.sleep(HEARTBEAT_INTERVAL)
+
+    def _expire(self):
+        """Drop finished jobs older than the retention period"""
+        cutoff = time.time() - self.retention
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at is not None and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def active_count(self):
+        """Number of queued or running jobs held by this process"""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def _checkpoint(self, method, *args):
+        """Call a journal method, logging (not raising) database errors"""
+        if not self.journal.enabled:
+            return None
+        try:
+            return getattr(self.journal, method)(*args)
+        except sqlite3.Error as e:
+            logger.warning(f"Job checkpoint {method} failed: {str(e)}")
+            return None
+
+    def submit(self, func, urls, options=None):
+        """
+        Queue a batch for background processing
+
+        Args:
+            func: Blocking function that takes a URL and returns a result dict
+            urls: URLs to process
+            options: Request options echoed back in the job status
+
+        Returns:
+            Job: The queued job
+        """
+        self._expire()
+
+        job = Job(urls, options)
+        self._checkpoint('start_run', job.id, job.urls, job.options, 'queued', os.getpid())
+        with self._lock:
+            self._jobs[job.id] = job
+
+        self._get_pool().submit(self._run, job, func)
+        logger.info(f"Queued job {job.id} with {len(job.urls)} URLs")
+        return job
+
+    def get(self, job_id):
+        """
+        Get a job by ID
+
+        Jobs not held by this process (e.g. accepted before a restart or by another
+        worker) are rebuilt from the checkpoint journal.
+
+        Returns:
+            Job: The job, or None if it is unknown
+        """
+        self._expire()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job or self.load(job_id)
+
+    def load(self, job_id):
+        """
+        Rebuild a job and its finished results from the checkpoint journal
+
+        Returns:
+            Job: A job that is not running in this process, or None if none was journaled
+        """
+        run = self._checkpoint('get_run', job_id)
+        if not run or run['urls'] is None:
+            return None
+
+        job = Job(run['urls'], run['options'], job_id=job_id)
+        job.status = run['status']
+        job.created_at = run['created_at']
+        job.cancel_requested = run['cancel_requested']
+        completed = self._checkpoint('completed', job_id) or {}
+        for index, url in enumerate(job.urls):
+            if url in completed:
+                job.record(index, completed[url][1])
+        return job
+
+    def resume(self, job_id, func):
+        """
+        Continue a journaled job, processing only URLs without a result
+
+        Args:
+            job_id: ID of the job to resume
+            func: Blocking function that takes a URL and returns a result dict
+
+        Returns:
+            Job: The resumed (or still running) job, or None if it is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job and not job.finished:
+            return job
+
+        job = self.load(job_id)
+        if job is None or job.status == 'completed':
+            return job
+
+        # Take the run over only if no live process owns it; otherwise every
+        # remaining URL would be fetched twice
+        if not self._checkpoint('claim', job.id, os.getpid()):
+            logger.info(f"Job {job.id} is still running in another process, not resuming it")
+            return job
+
+        job.status = 'queued'
+        job.finished_at = None
+        job.cancel_requested = False
+        with self._lock:
+            self._jobs[job.id] = job
+
+        self._get_pool().submit(self._run, job, func)
+        logger.info(f"Resumed job {job.id}: {len(job.pending_indexes)} of {len(job.urls)} URLs left")
+        return job
+
+    def cancel(self, job_id):
+        """
+        Stop a job after the URLs currently in flight
+
+        Returns:
+            Job: The job, or None if it is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            # Not running here: a live owner stops it on its next heartbeat, and an
+            # abandoned run is marked so it is not resumed
+            job = self.load(job_id)
+            if job and not job.finished:
+                if self._checkpoint('request_cancel', job_id):
+                    job.cancel_requested = True
+                else:
+                    job.status = 'cancelled'
+            return job
+
+        if not job.finished:
+            job.cancel_requested = True
+        return job
+
+    def _finish(self, job, status):
+        """Give a job its final status (finished_at first, so a finished job always has one)"""
+        with self._lock:
+            job.finished_at = time.time()
+            job.status = status
+        self._checkpoint('set_status', job.id, status)
+
+    def _run(self, job, func):
+        """Process every URL of a job, recording results as they complete"""
+        if job.cancel_requested:
+            self._finish(job, 'cancelled')
+            return
+
+        job.status = 'running'
+        job.started_at = time.time()
+        self._checkpoint('set_status', job.id, job.status)
+
+        # Only URLs without a result are processed (all of them unless resumed),
+        # each distinct site once
+        pending = job.pending_indexes
+        unique_urls, positions = dedupe_urls([job.urls[index] for index in pending])
+        inputs = [[] for _ in unique_urls]
+        for index, position in zip(pending, positions):
+            inputs[position].append(index)
+
+        async def runner():
+            engine = FetchEngine()
+            async for position, url, result in engine.as_completed(func, unique_urls):
+                if isinstance(result, Exception):
+                    result = {'success': False, 'url': url, 'error': str(result)}
+                for index in inputs[position]:
+                    job.record(index, result)
+                    self._checkpoint('record', job.id, job.urls[index], result, index)
+                if job.cancel_requested or job.interrupted:
+                    break
+
+        try:
+            run_sync(runner())
+            if job.interrupted:
+                status = 'interrupted'
+            else:
+                status = 'cancelled' if job.cancel_requested else 'completed'
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            job.error = str(e)
+            status = 'failed'
+
+        self._finish(job, status)
+        logger.info(f"Job {job.id} {job.status}: {job.completed}/{len(job.urls)} URLs processed")
+
+    def shutdown(self, timeout=0):
+        """
+        Let running jobs finish for up to timeout seconds, then interrupt the rest
+
+        Interrupted jobs stop after the URLs in flight and are journaled as
+        'interrupted', so another process can resume them right away instead of
+        waiting for their heartbeat to time out.
+
+        Args:
+            timeout: Seconds to wait for unfinished jobs
+
+        Returns:
+            int: Number of jobs interrupted
+        """
+        deadline = time.time() + timeout
+        while self.active_count() and time.time() < deadline:
+            time.sleep(0.5)
+
+        with self._lock:
+            unfinished = [job for job in self._jobs.values() if not job.finished]
+            pool, self._pool = self._pool, None
+            self._heartbeat = None
+        for job in unfinished:
+            job.interrupted = True
+            self._checkpoint('set_status', job.id, 'interrupted')
+            logger.warning(f"Job {job.id} interrupted: {job.completed}/{len(job.urls)} URLs processed")
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return len(unfinished)
+
+    def reset(self):
+        """Forget the runner pool and heartbeat thread, e.g. after forking a worker process"""
+        with self._lock:
+            self._pool = None
+            self._heartbeat = None
+            self._jobs.clear()
+
+# Process-wide job manager used by the API
+manager = JobManager()
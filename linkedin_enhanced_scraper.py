@@ -9,10 +9,12 @@ This module extends the LinkedIn scraper functionality to extract:
 
 import logging
 import re
-import urllib.request
 from urllib.parse import urlparse, urljoin
-import trafilatura
-from bs4 import BeautifulSoup
+from html_parsing import make_soup
+from functools import partial
+from http_client import fetch_html
+from fetch_engine import run_parallel
+from section_utils import parse_sections
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -42,8 +44,8 @@ def extract_posts(linkedin_url):
         posts_url = linkedin_url
     
     try:
-        # Use trafilatura to get HTML content
-        downloaded = trafilatura.fetch_url(posts_url)
+        # Get HTML content over the shared connection pools
+        downloaded = fetch_html(posts_url)
         
         # Check for login redirect
         login_redirect = False
@@ -51,7 +53,7 @@ def extract_posts(linkedin_url):
             login_redirect = True
             logger.warning(f"LinkedIn requires login to view posts. Using main company page instead: {linkedin_url}")
             # Try using the main company page to at least get some activity info
-            downloaded = trafilatura.fetch_url(linkedin_url)
+            downloaded = fetch_html(linkedin_url)
             if not downloaded:
                 logger.error(f"Failed to download company page: {linkedin_url}")
                 # Return a basic structure with explanation
@@ -67,7 +69,7 @@ def extract_posts(linkedin_url):
                 }
         
         # Parse with BeautifulSoup
-        soup = BeautifulSoup(downloaded, 'html.parser')
+        soup = make_soup(downloaded)
         
         # Find post elements
         posts_data = {
@@ -212,8 +214,8 @@ def extract_job_openings(linkedin_url):
         jobs_url = linkedin_url
     
     try:
-        # Use trafilatura to get HTML content
-        downloaded = trafilatura.fetch_url(jobs_url)
+        # Get HTML content over the shared connection pools
+        downloaded = fetch_html(jobs_url)
         
         # Check for login redirect
         login_redirect = False
@@ -222,7 +224,7 @@ def extract_job_openings(linkedin_url):
             login_redirect = True
             logger.warning(f"LinkedIn requires login to view jobs. Using main company page instead: {linkedin_url}")
             # Try using the main company page to at least get some job info
-            downloaded = trafilatura.fetch_url(linkedin_url)
+            downloaded = fetch_html(linkedin_url)
             if not downloaded:
                 logger.error(f"Failed to download company page: {linkedin_url}")
                 # Return a basic structure with explanation about authentication
@@ -239,7 +241,7 @@ def extract_job_openings(linkedin_url):
                 }
         
         # Parse with BeautifulSoup
-        soup = BeautifulSoup(downloaded, 'html.parser')
+        soup = make_soup(downloaded)
         
         # Initialize jobs data
         jobs_data = {
@@ -375,8 +377,8 @@ def extract_people(linkedin_url):
         people_url = linkedin_url
     
     try:
-        # Use trafilatura to get HTML content
-        downloaded = trafilatura.fetch_url(people_url)
+        # Get HTML content over the shared connection pools
+        downloaded = fetch_html(people_url)
         
         # Check for login redirect
         login_redirect = False
@@ -384,7 +386,7 @@ def extract_people(linkedin_url):
             login_redirect = True
             logger.warning(f"LinkedIn requires login to view people. Using main company page instead: {linkedin_url}")
             # Try using the main company page to at least get some employee info
-            downloaded = trafilatura.fetch_url(linkedin_url)
+            downloaded = fetch_html(linkedin_url)
             if not downloaded:
                 logger.error(f"Failed to download company page: {linkedin_url}")
                 # Return a basic structure with explanation
@@ -402,7 +404,7 @@ def extract_people(linkedin_url):
                 }
         
         # Parse with BeautifulSoup
-        soup = BeautifulSoup(downloaded, 'html.parser')
+        soup = make_soup(downloaded)
         
         # Initialize people data
         people_data = {
@@ -611,31 +613,44 @@ def extract_people(linkedin_url):
             'error': str(e)
         }
 
-def extract_all_enhanced_data(linkedin_url):
+# Section name -> extractor, in the order sections appear in the combined result
+SECTION_EXTRACTORS = {
+    'posts': extract_posts,
+    'jobs': extract_job_openings,
+    'people': extract_people
+}
+
+def extract_all_enhanced_data(linkedin_url, sections=None):
     """
     Extract all enhanced data: posts, jobs, and people
     
+    The requested sections are fetched and parsed concurrently.
+    
     Args:
         linkedin_url: LinkedIn company profile URL
+        sections: Sections to extract, any of 'posts', 'jobs', 'people', as a list or
+                  comma-separated string (default all)
         
     Returns:
         Dictionary with all enhanced data
     """
-    enhanced_data = {}
-    
-    # Extract posts
-    posts_data = extract_posts(linkedin_url)
-    if posts_data:
-        enhanced_data['posts'] = posts_data
+    try:
+        sections = parse_sections(sections, SECTION_EXTRACTORS)
+    except ValueError as e:
+        logger.warning(f"Invalid LinkedIn sections requested: {str(e)}")
+        return {
+            'error': str(e)
+        }
     
-    # Extract job openings
-    jobs_data = extract_job_openings(linkedin_url)
-    if jobs_data:
-        enhanced_data['jobs'] = jobs_data
+    section_data = run_parallel({
+        section: partial(extractor, linkedin_url)
+        for section, extractor in SECTION_EXTRACTORS.items() if section in sections
+    })
     
-    # Extract people
-    people_data = extract_people(linkedin_url)
-    if people_data:
-        enhanced_data['people'] = people_data
+    # Only keep sections that returned data
+    enhanced_data = {}
+    for section, data in section_data.items():
+        if data:
+            enhanced_data[section] = data
     
-    return enhanced_data
\ No newline at end of file
+    return enhanced_data
@@ -1,9 +1,9 @@
 import logging
 import re
-import urllib.request
 from urllib.parse import urlparse, urljoin
-import trafilatura
-from bs4 import BeautifulSoup
+from html_parsing import make_soup
+from http_client import fetch_html
+from fetch_engine import FetchEngine
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -21,14 +21,14 @@ def extract_linkedin_url(url):
         
         logger.info(f"Searching for LinkedIn URL on: {url}")
         
-        # Use trafilatura to get the HTML content
-        downloaded = trafilatura.fetch_url(url)
+        # Get the HTML content over the shared connection pools
+        downloaded = fetch_html(url)
         if not downloaded:
             logger.error(f"Failed to download URL: {url}")
             return None
         
         # Parse with BeautifulSoup for better tag access
-        soup = BeautifulSoup(downloaded, 'html.parser')
+        soup = make_soup(downloaded)
         
         # Method 1: Look for direct LinkedIn links in social media sections
         linkedin_urls = []
@@ -98,6 +98,20 @@ def extract_linkedin_url(url):
         logger.error(f"Error extracting LinkedIn URL: {str(e)}")
         return None
 
+async def extract_linkedin_url_async(url, engine=None):
+    """
+    Async variant of extract_linkedin_url that respects the engine's concurrency limits
+    
+    Args:
+        url: Company website URL
+        engine: FetchEngine to run on (a new one is created if omitted)
+        
+    Returns:
+        str: LinkedIn URL if found, None otherwise
+    """
+    engine = engine or FetchEngine()
+    return await engine.run(url, extract_linkedin_url, url)
+
 def find_and_extract_linkedin_about(website_url):
     """
     Main function to find LinkedIn URL from a website and extract the company about section.
@@ -1,7 +1,9 @@
 from flask import Flask
 from flask_cors import CORS
+import importlib
 import os
 import logging
+import http_client
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -12,6 +14,9 @@ app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key")
 CORS(app)
 
+# Cache DNS answers for the whole server process
+http_client.install_dns_cache()
+
 # Set LinkedIn credentials from environment variables 
 os.environ['LINKEDIN_EMAIL'] = os.environ.get('LINKEDIN_EMAIL', '')
 os.environ['LINKEDIN_PASSWORD'] = os.environ.get('LINKEDIN_PASSWORD', '')
@@ -25,6 +30,15 @@ app.register_blueprint(main_bp)
 app.register_blueprint(api_bp)
 app.register_blueprint(scrape_bp)
 
+# Heavy modules the request handlers import on first use; a preforking server
+# can call preload() to load them once in the master process instead
+DEFERRED_MODULES = ('scraper', 'linkedin_finder', 'enhanced_linkedin_scraper', 'trafilatura')
+
+def preload():
+    """Import the modules the handlers would otherwise load on their first request"""
+    for name in DEFERRED_MODULES:
+        importlib.import_module(name)
+
 # This is required for the gunicorn command to work properly
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,363 @@
+"""
+Per-Host Rate Limiter
+
+This module implements a token-bucket limiter keyed by host:
+1. Each host refills at a fixed number of requests per second up to a burst size
+2. Callers reserve a slot and sleep only as long as that slot is in the future
+3. State is shared by all threads, and optionally by all worker processes through
+   a SQLite file (set SCRAPER_RATE_LIMIT_DB)
+4. Hosts that answer with blocking responses (429/999, and 403 from LinkedIn) get a
+   lower rate for a while; the penalty decays with time and is shared through the
+   same SQLite file (see BlockTracker)
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Default sustained request rate per host (requests per second) and burst size
+DEFAULT_RATE = float(os.environ.get('SCRAPER_RATE_LIMIT', '2'))
+DEFAULT_BURST = float(os.environ.get('SCRAPER_RATE_BURST', '4'))
+
+# LinkedIn answers bursts with 999/403, so it gets a much lower sustained rate. The
+# burst covers one profile's four sections, which extract_all_company_data fetches
+# at the same time.
+LINKEDIN_RATE = float(os.environ.get('SCRAPER_LINKEDIN_RATE_LIMIT', '0.5'))
+LINKEDIN_BURST = float(os.environ.get('SCRAPER_LINKEDIN_RATE_BURST', '4'))
+
+# Optional SQLite file that shares bucket state between worker processes
+STATE_PATH = os.environ.get('SCRAPER_RATE_LIMIT_DB', '')
+
+# Seconds for a host's blocking penalty to halve
+BLOCK_HALF_LIFE = float(os.environ.get('SCRAPER_BLOCK_HALF_LIFE', '300'))
+
+# Largest factor a blocked host's rate is divided by
+BLOCK_MAX_BACKOFF = float(os.environ.get('SCRAPER_BLOCK_MAX_BACKOFF', '8'))
+
+# Responses that mean "slow down" from any host, and from LinkedIn only
+BLOCK_STATUS_CODES = (429, 999)
+LINKEDIN_BLOCK_STATUS_CODES = (403, 429, 999)
+
+def host_key(url):
+    """
+    Get the politeness key for a URL
+
+    All LinkedIn subdomains share one key so they share one limit.
+
+    Args:
+        url: URL (or bare host) being fetched
+
+    Returns:
+        str: Lower-cased host name
+    """
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    host = (urlparse(url).hostname or '').lower()
+    if host == 'linkedin.com' or host.endswith('.linkedin.com'):
+        return 'linkedin.com'
+    return host
+
+def _open_state(path):
+    """Open the shared state file, creating its tables on first use"""
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS rate_buckets '
+        '(host TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+    )
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS block_penalties '
+        '(host TEXT PRIMARY KEY, penalty REAL NOT NULL, updated REAL NOT NULL)'
+    )
+    return conn
+
+class BlockTracker:
+    """
+    Per-host record of recent blocking responses
+
+    Every block adds 1 to the host's penalty, which then halves every
+    BLOCK_HALF_LIFE seconds. A host counts as blocked while its penalty is at
+    least 0.5, i.e. for one half-life after a single block and longer after
+    repeated ones, and then recovers on its own.
+
+    With a state file (SCRAPER_RATE_LIMIT_DB) penalties are shared by every
+    process using it, so a block seen by one gunicorn worker slows all of them.
+    """
+
+    def __init__(self, half_life=BLOCK_HALF_LIFE, state_path=STATE_PATH):
+        self.half_life = half_life
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._penalties = {}
+        self._local = threading.local()
+
+    def _decay(self, penalty, updated, now):
+        if self.half_life <= 0:
+            return 0.0
+        return penalty * 0.5 ** (max(0.0, now - updated) / self.half_life)
+
+    def _connection(self):
+        """Get this thread's connection to the shared state file"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = _open_state(self.state_path)
+        return conn
+
+    def _shared(self, operation, *args):
+        """Run an operation on the shared state, or return None if it is unavailable"""
+        if not self.state_path:
+            return None
+        try:
+            return operation(self._connection(), *args)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared block state unavailable, using in-process state: {str(e)}")
+            return None
+
+    def _add_shared(self, conn, host, now):
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT penalty, updated FROM block_penalties WHERE host = ?', (host,)).fetchone()
+            penalty = (self._decay(*row, now) if row else 0.0) + 1
+            conn.execute(
+                'INSERT OR REPLACE INTO block_penalties (host, penalty, updated) VALUES (?, ?, ?)',
+                (host, penalty, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return penalty
+
+    def _get_shared(self, conn, host, now):
+        row = conn.execute('SELECT penalty, updated FROM block_penalties WHERE host = ?', (host,)).fetchone()
+        if row is None:
+            return 0.0
+        penalty = self._decay(*row, now)
+        if penalty < 0.01:
+            # Fully recovered
+            conn.execute('DELETE FROM block_penalties WHERE host = ? AND updated = ?', (host, row[1]))
+        return penalty
+
+    def _all_shared(self, conn, now):
+        rows = conn.execute('SELECT host, penalty, updated FROM block_penalties')
+        return {host: self._decay(penalty, updated, now) for host, penalty, updated in rows}
+
+    def record_block(self, url):
+        """
+        Note a blocking response from a URL's host
+
+        Returns:
+            float: The host's penalty after this block
+        """
+        host = host_key(url)
+        now = time.time()
+        penalty = self._shared(self._add_shared, host, now)
+        if penalty is None:
+            with self._lock:
+                penalty = self._decay(*self._penalties.get(host, (0.0, now)), now) + 1
+                self._penalties[host] = (penalty, now)
+        logger.warning(f"Blocking response from {host} (penalty {penalty:.2f})")
+        return penalty
+
+    def observe(self, url, status_code):
+        """Record a response, counting it as a block if its status means one"""
+        blocking = LINKEDIN_BLOCK_STATUS_CODES if host_key(url) == 'linkedin.com' else BLOCK_STATUS_CODES
+        if status_code in blocking:
+            self.record_block(url)
+
+    def penalty(self, url):
+        """Get a URL's host penalty (0 when it has not blocked us recently)"""
+        host = host_key(url)
+        now = time.time()
+        penalty = self._shared(self._get_shared, host, now)
+        if penalty is not None:
+            return penalty
+
+        with self._lock:
+            penalty = self._decay(*self._penalties.get(host, (0.0, now)), now)
+            if host in self._penalties and penalty < 0.01:
+                # Fully recovered
+                del self._penalties[host]
+        return penalty
+
+    def is_blocked(self, url):
+        """Check whether a URL's host has blocked us recently"""
+        return self.penalty(url) >= 0.5
+
+    def backoff(self, url):
+        """Get the factor a host's request rate is divided by (1 when not blocked)"""
+        penalty = self.penalty(url)
+        if penalty < 0.5:
+            return 1.0
+        return min(BLOCK_MAX_BACKOFF, 1 + penalty)
+
+    def reset(self):
+        """Forget in-process penalties and drop connections to the shared state file"""
+        with self._lock:
+            self._penalties.clear()
+        self._local = threading.local()
+
+    def stats(self):
+        """
+        Get the current penalties
+
+        Returns:
+            dict: Host -> penalty for hosts that blocked us recently
+        """
+        now = time.time()
+        penalties = self._shared(self._all_shared, now)
+        if penalties is None:
+            with self._lock:
+                penalties = {host: self._decay(*entry, now) for host, entry in self._penalties.items()}
+        return {host: round(penalty, 3) for host, penalty in penalties.items() if penalty >= 0.01}
+
+class RateLimiter:
+    """
+    Token-bucket limiter with one bucket per host
+
+    A bucket holds up to `burst` tokens and gains `rate` tokens per second. Taking a
+    token may drive the balance negative, which reserves a future slot; the caller
+    then sleeps exactly until that slot instead of polling.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, host_limits=None, state_path=STATE_PATH,
+                 blocks=None):
+        self.rate = rate
+        self.burst = burst
+        self.host_limits = {'linkedin.com': (LINKEDIN_RATE, LINKEDIN_BURST)}
+        self.host_limits.update(host_limits or {})
+        self.state_path = state_path
+        self.blocks = blocks or BlockTracker(state_path=state_path)
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._local = threading.local()
+
+    def set_limit(self, host, rate, burst):
+        """Override the rate (requests/second) and burst for one host"""
+        with self._lock:
+            self.host_limits[host_key(host)] = (rate, burst)
+
+    def get_limit(self, host):
+        """Get the (rate, burst) that applies to a host"""
+        return self.host_limits.get(host_key(host), (self.rate, self.burst))
+
+    def effective_limit(self, host):
+        """
+        Get the (rate, burst) to use right now
+
+        A host that blocked us recently gets its rate divided by its backoff
+        factor and no burst, until the penalty decays.
+        """
+        rate, burst = self.get_limit(host)
+        backoff = self.blocks.backoff(host)
+        if backoff > 1:
+            return rate / backoff, 1.0
+        return rate, burst
+
+    def _reserve_local(self, host, rate, burst):
+        """Take a token from the in-process bucket and return the wait in seconds"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(host, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate) - 1
+            self._buckets[host] = (tokens, now)
+        return max(0.0, -tokens / rate)
+
+    def reset(self):
+        """Drop connections to the shared state file, e.g. after forking a worker process"""
+        self._local = threading.local()
+
+    def _connection(self):
+        """Get this thread's connection to the shared state file"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = _open_state(self.state_path)
+        return conn
+
+    def _reserve_shared(self, host, rate, burst):
+        """Take a token from the cross-process bucket and return the wait in seconds"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            row = conn.execute('SELECT tokens, updated FROM rate_buckets WHERE host = ?', (host,)).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens = min(burst, tokens + max(0.0, now - updated) * rate) - 1
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_buckets (host, tokens, updated) VALUES (?, ?, ?)',
+                (host, tokens, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return max(0.0, -tokens / rate)
+
+    def reserve(self, url):
+        """
+        Reserve the next request slot for a URL's host without sleeping
+
+        Args:
+            url: URL (or bare host) about to be fetched
+
+        Returns:
+            float: Seconds the caller must wait before sending the request
+        """
+        host = host_key(url)
+        rate, burst = self.effective_limit(host)
+        if rate <= 0:
+            return 0.0
+
+        if self.state_path:
+            try:
+                return self._reserve_shared(host, rate, burst)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared rate limit state unavailable, using in-process limits: {str(e)}")
+        return self._reserve_local(host, rate, burst)
+
+    def acquire(self, url):
+        """
+        Block until a request to the URL's host is allowed
+
+        Args:
+            url: URL (or bare host) about to be fetched
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        wait = self.reserve(url)
+        if wait > 0:
+            logger.debug(f"Rate limiting {host_key(url)}: waiting {wait:.2f}s")
+            time.sleep(wait)
+        return wait
+
+# Process-wide blocking state, shared by the limiter and the scrapers
+blocks = BlockTracker()
+
+# Process-wide limiter used by the HTTP client
+limiter = RateLimiter(blocks=blocks)
+
+def acquire(url):
+    """Block until a request to the URL's host is allowed (see RateLimiter.acquire)"""
+    return limiter.acquire(url)
+
+def use_state_file(path):
+    """
+    Share this process's rate limits and block penalties through a SQLite file
+
+    Used as a process pool initializer, so pool processes limit each host together
+    instead of each one getting the full rate.
+
+    Args:
+        path: SQLite state file (created on first use)
+    """
+    limiter.state_path = path
+    blocks.state_path = path
+    limiter.reset()
+    blocks.reset()
@@ -2,10 +2,17 @@
 API routes for LinkedIn Business Intelligence Extractor
 """
 from flask import Blueprint, request, jsonify
-from scraper import scrape_website
-from linkedin_finder import extract_linkedin_url, find_and_extract_linkedin_about
-from enhanced_linkedin_scraper import extract_all_company_data
+from fetch_engine import map_concurrent
+from streaming import get_stream_format, stream_batch
+from http_client import PAGE_CACHE, PAGE_FLIGHTS
+from jobs import manager as job_manager, MAX_JOB_URLS
+from url_utils import canonicalize_url, dedupe_urls
+from section_utils import parse_sections
+import disk_cache
+import rate_limiter
+from functools import partial
 import logging
+import sys
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -13,9 +20,16 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+# The scraper modules (and trafilatura/bs4 behind them) are imported inside the
+# handlers, so workers boot without loading them until the first request needs them
+
 @api_bp.route('/scrape', methods=['POST'])
 def scrape():
     """API endpoint for scraping websites"""
+    from scraper import scrape_website
+    from linkedin_finder import find_and_extract_linkedin_about
+    from enhanced_linkedin_scraper import extract_all_company_data, SECTION_EXTRACTORS
+    
     data = request.get_json()
     
     if not data or 'url' not in data:
@@ -28,6 +42,15 @@ def scrape():
     mode = data.get('mode', 'direct')  # Default to direct scraping
     use_auth = data.get('use_auth', False)  # Authentication option
     
+    # Optional subset of LinkedIn sections to fetch
+    try:
+        sections = parse_sections(data.get('sections'), SECTION_EXTRACTORS)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
     # Add http:// prefix if not present
     if not url.startswith(('http://', 'https://')):
         url = 'https://' + url
@@ -36,7 +59,7 @@ def scrape():
         # Authenticated LinkedIn scraping mode
         if use_auth and ('linkedin.com' in url):
             logger.info(f"API: Using authenticated scraping for LinkedIn URL: {url}")
-            enhanced_data = extract_all_company_data(url)
+            enhanced_data = extract_all_company_data(url, sections=sections)
             
             # Create result structure
             result = {
@@ -91,7 +114,7 @@ def scrape():
             if use_auth and linkedin_result.get("linkedin_url"):
                 linkedin_url = linkedin_result["linkedin_url"]
                 logger.info(f"API: Using authenticated scraping for found LinkedIn URL: {linkedin_url}")
-                enhanced_data = extract_all_company_data(linkedin_url)
+                enhanced_data = extract_all_company_data(linkedin_url, sections=sections)
                 
                 # Merge the enhanced data with existing data
                 company_data = linkedin_result["company_data"]
@@ -138,6 +161,8 @@ def scrape():
 @api_bp.route('/find_linkedin', methods=['POST'])
 def find_linkedin():
     """API endpoint just for finding LinkedIn URLs without scraping them"""
+    from linkedin_finder import extract_linkedin_url
+    
     data = request.get_json()
     
     if not data or 'url' not in data:
@@ -175,6 +200,88 @@ def find_linkedin():
             'error': str(e)
         }), 500
 
+def process_batch_url(url, mode, use_auth):
+    """
+    Process a single batch URL
+    
+    Args:
+        url: Website or LinkedIn URL
+        mode: 'find_linkedin' or 'direct'
+        use_auth: Whether to use authenticated LinkedIn scraping
+        
+    Returns:
+        dict: Per-URL result entry
+    """
+    from scraper import scrape_website
+    from linkedin_finder import find_and_extract_linkedin_about
+    from enhanced_linkedin_scraper import extract_all_company_data
+    
+    try:
+        # Canonical form: scheme, lower-case IDNA host, no tracking parameters
+        url = canonicalize_url(url)
+        
+        # Process based on mode
+        if mode == 'find_linkedin':
+            # Find LinkedIn URL and extract data
+            result = find_and_extract_linkedin_about(url)
+            
+            if result["success"]:
+                return {
+                    'success': True,
+                    'website_url': url,
+                    'linkedin_url': result["linkedin_url"],
+                    'data': result["company_data"]
+                }
+            return {
+                'success': False,
+                'website_url': url,
+                'error': result["message"]
+            }
+        
+        # Direct scraping mode
+        elif mode == 'direct':
+            # Direct scraping of the URL (LinkedIn or regular website)
+            if 'linkedin.com' in url and use_auth:
+                enhanced_data = extract_all_company_data(url)
+                return {
+                    'success': True,
+                    'url': url,
+                    'data': {
+                        'company_name': "LinkedIn Company",
+                        'description': "Data extracted with LinkedIn authentication",
+                        'linkedin_data': enhanced_data,
+                        'authenticated': True
+                    }
+                }
+            
+            # Regular scraping for non-LinkedIn URLs
+            result = scrape_website(url)
+            if result is not None:
+                return {
+                    'success': True,
+                    'url': url,
+                    'data': result
+                }
+            return {
+                'success': False,
+                'url': url,
+                'error': 'Failed to extract data from website'
+            }
+        
+        return {
+            'success': False,
+            'url': url,
+            'error': f'Invalid mode: {mode}'
+        }
+        
+    except Exception as e:
+        logger.error(f"Batch error for URL {url}: {str(e)}")
+        return {
+            'success': False,
+            'url': url,
+            'error': str(e)
+        }
+
 @api_bp.route('/batch', methods=['POST'])
 def batch_process():
     """API endpoint for batch processing multiple URLs"""
@@ -196,84 +303,32 @@ def batch_process():
             'error': 'URLs must be provided as an array'
         }), 400
     
+    # Large batches run as a background job that the client polls
+    if data.get('background', False):
+        return submit_batch_job(urls, mode, use_auth)
+    
+    # Streamed batches send each result as soon as it finishes
+    stream_format = get_stream_format(data)
+    if stream_format:
+        if len(urls) > MAX_JOB_URLS:
+            return jsonify({
+                'success': False,
+                'error': f'Maximum {MAX_JOB_URLS} URLs allowed in streaming mode'
+            }), 400
+        return stream_batch(partial(process_batch_url, mode=mode, use_auth=use_auth), urls, stream_format)
+    
     if len(urls) > 20:
         return jsonify({
             'success': False,
             'error': 'Maximum 20 URLs allowed in batch mode'
         }), 400
     
-    results = []
+    # Fetch each distinct site once, then fan results back out to every input
+    unique_urls, positions = dedupe_urls(urls)
     
-    for url in urls:
-        try:
-            # Add http:// prefix if not present
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-            
-            # Process based on mode
-            if mode == 'find_linkedin':
-                # Find LinkedIn URL and extract data
-                result = find_and_extract_linkedin_about(url)
-                
-                if result["success"]:
-                    results.append({
-                        'success': True,
-                        'website_url': url,
-                        'linkedin_url': result["linkedin_url"],
-                        'data': result["company_data"]
-                    })
-                else:
-                    results.append({
-                        'success': False,
-                        'website_url': url,
-                        'error': result["message"]
-                    })
-            
-            # Direct scraping mode
-            elif mode == 'direct':
-                # Direct scraping of the URL (LinkedIn or regular website)
-                if 'linkedin.com' in url and use_auth:
-                    enhanced_data = extract_all_company_data(url)
-                    results.append({
-                        'success': True,
-                        'url': url,
-                        'data': {
-                            'company_name': "LinkedIn Company",
-                            'description': "Data extracted with LinkedIn authentication",
-                            'linkedin_data': enhanced_data,
-                            'authenticated': True
-                        }
-                    })
-                else:
-                    # Regular scraping for non-LinkedIn URLs
-                    result = scrape_website(url)
-                    if result is not None:
-                        results.append({
-                            'success': True,
-                            'url': url,
-                            'data': result
-                        })
-                    else:
-                        results.append({
-                            'success': False,
-                            'url': url,
-                            'error': 'Failed to extract data from website'
-                        })
-            
-            else:
-                results.append({
-                    'success': False,
-                    'url': url,
-                    'error': f'Invalid mode: {mode}'
-                })
-            
-        except Exception as e:
-            logger.error(f"Batch error for URL {url}: {str(e)}")
-            results.append({
-                'success': False,
-                'url': url,
-                'error': str(e)
-            })
+    # Process URLs concurrently with per-host limits; results keep input order
+    unique_results = map_concurrent(partial(process_batch_url, mode=mode, use_auth=use_auth), unique_urls)
+    results = [unique_results[position] for position in positions]
     
     return jsonify({
         'success': True,
@@ -283,11 +338,137 @@ def batch_process():
         'failed': sum(1 for r in results if not r.get('success', False))
     })
 
+def submit_batch_job(urls, mode, use_auth):
+    """
+    Queue a batch as a background job
+    
+    Args:
+        urls: URLs to process
+        mode: 'find_linkedin' or 'direct'
+        use_auth: Whether to use authenticated LinkedIn scraping
+        
+    Returns:
+        Response: 202 with the job ID, or 400 if the batch is too large
+    """
+    if len(urls) > MAX_JOB_URLS:
+        return jsonify({
+            'success': False,
+            'error': f'Maximum {MAX_JOB_URLS} URLs allowed per job'
+        }), 400
+    
+    job = job_manager.submit(
+        partial(process_batch_url, mode=mode, use_auth=use_auth),
+        urls,
+        {'mode': mode, 'use_auth': use_auth}
+    )
+    
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'total': len(urls),
+        'status_url': f'/api/jobs/{job.id}'
+    }), 202
+
+@api_bp.route('/jobs', methods=['POST'])
+def create_job():
+    """API endpoint for submitting a background batch job"""
+    data = request.get_json()
+    
+    if not data or not isinstance(data.get('urls'), list):
+        return jsonify({
+            'success': False,
+            'error': 'URLs parameter is required as an array'
+        }), 400
+    
+    return submit_batch_job(data['urls'], data.get('mode', 'find_linkedin'), data.get('use_auth', False))
+
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """API endpoint for polling a background job's progress and partial results"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    include_results = request.args.get('results', 'true').lower() != 'false'
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    
+    return jsonify({
+        'success': True,
+        **job.to_dict(include_results=include_results, offset=max(offset, 0), limit=limit)
+    })
+
+@api_bp.route('/jobs/<job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    """API endpoint for resuming an interrupted job from its checkpoint"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    options = job.options
+    job = job_manager.resume(job_id, partial(
+        process_batch_url,
+        mode=options.get('mode', 'find_linkedin'),
+        use_auth=options.get('use_auth', False)
+    ))
+    # Finished jobs are only resumable from the checkpoint journal, and a
+    # completed one has nothing left to process
+    if job is None or job.status == 'completed':
+        return jsonify({
+            'success': False,
+            'error': 'Job has nothing to resume'
+        }), 409
+    
+    return jsonify({
+        'success': True,
+        'remaining': len(job.pending_indexes),
+        **job.to_dict(include_results=False)
+    }), 202
+
+@api_bp.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """API endpoint for cancelling a background job"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        **job.to_dict(include_results=False)
+    })
+
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for AWS Amplify"""
+    # Report scraper module stats only once a request has loaded them, so load
+    # balancer probes do not import them right after boot
+    scraper = sys.modules.get('scraper')
+    linkedin = sys.modules.get('enhanced_linkedin_scraper')
+    
     return jsonify({
         'status': 'healthy',
         'service': 'LinkedIn Business Intelligence Extractor API',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'cache': {
+            'pages': PAGE_CACHE.stats(),
+            'linkedin': linkedin.CACHE.stats() if linkedin else {},
+            'disk': disk_cache.cache.stats()
+        },
+        'coalescing': {
+            'pages': PAGE_FLIGHTS.stats(),
+            'scrape_website': scraper.SCRAPE_FLIGHTS.stats() if scraper else {},
+            'extract_all_company_data': linkedin.COMPANY_FLIGHTS.stats() if linkedin else {},
+            'fetch_linkedin_page': linkedin.PAGE_FLIGHTS.stats() if linkedin else {}
+        },
+        'blocked_hosts': rate_limiter.blocks.stats()
     })
\ No newline at end of file
@@ -2,9 +2,6 @@
 Scraping routes for LinkedIn Business Intelligence Extractor
 """
 from flask import Blueprint, render_template, request, flash, redirect, url_for
-from scraper import scrape_website
-from linkedin_finder import extract_linkedin_url, find_and_extract_linkedin_about
-from enhanced_linkedin_scraper import extract_all_company_data
 import logging
 
 # Set up logging
@@ -16,6 +13,10 @@ scrape_bp = Blueprint('scrape', __name__)
 @scrape_bp.route('/scrape', methods=['GET', 'POST'])
 def scrape():
     """Handle website scraping requests"""
+    from scraper import scrape_website
+    from linkedin_finder import find_and_extract_linkedin_about
+    from enhanced_linkedin_scraper import extract_all_company_data
+    
     if request.method == 'GET':
         # If accessed directly via GET, redirect to the main page
         return redirect(url_for('main.index'))
@@ -1,17 +1,60 @@
 import re
-import urllib.request
+import time
+import hashlib
 import logging
-import trafilatura
-from bs4 import BeautifulSoup
+from bs4 import NavigableString, Tag
+from bs4.element import Script, Stylesheet, TemplateString
+from html_parsing import make_soup, get_backend
 import json
+import copy
+import functools
 from urllib.parse import urlparse
 from html.parser import HTMLParser
 from linkedin_enhanced_scraper import extract_all_enhanced_data
+from http_client import fetch_page, CACHE_MAX_ENTRIES, CACHE_TTL
+from ttl_cache import TTLCache
+from singleflight import SingleFlight
+from url_utils import canonical_key
+import disk_cache
+from fetch_engine import FetchEngine
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Bump whenever extraction logic changes so stored results are not reused
+EXTRACTOR_VERSION = '5'
+
+# Recent extraction results, in front of the results stored in the disk cache
+RESULT_CACHE = TTLCache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+
+# Concurrent scrape_website calls for the same canonical URL share one scrape
+SCRAPE_FLIGHTS = SingleFlight('scrape_website')
+
+def result_cache_key(url, content):
+    """
+    Build the key under which an extraction result is stored
+
+    Args:
+        url: Scraped URL
+        content: Raw page body (bytes)
+
+    Returns:
+        str: Key combining extractor version, HTML parser backend, canonical URL
+             and content hash
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    # Backends build different trees, so results are only reused with the same one
+    return f"v{EXTRACTOR_VERSION}:{get_backend()}:{canonical_key(url)}:{digest}"
+
+# Patterns MyHTMLParser uses to spot contact details in text nodes
+CONTACT_EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+')
+CONTACT_PHONE_RE = re.compile(r'\+?\d{1,4}?[-.\s]?\(?\d{1,3}?\)?[-.\s]?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,4}')
+CONTACT_ADDRESS_RE = re.compile(r'\d{1,4}[\w\s]+[,\-.\d]*\s*(Street|Ave|Road|Boulevard|Lane)')
+
+# bs4 string types that carry document text (comments, doctypes and the like do not)
+TEXT_NODE_TYPES = (NavigableString, Script, Stylesheet, TemplateString)
+
 # Custom HTML Parser class based on the uploaded file
 class MyHTMLParser(HTMLParser):
     def __init__(self):
@@ -25,6 +68,31 @@ class MyHTMLParser(HTMLParser):
         self.headings = []  # Store heading data to analyze better
         self.current_tag = None  # Track the current tag being processed
 
+    def feed_soup(self, soup):
+        """
+        Replay an already parsed document through the handlers
+
+        Walks the BeautifulSoup tree once, emitting the same start tag, end tag and
+        text events the tokenizer would, so the page is not tokenized a second time.
+
+        Args:
+            soup: Parsed document (see html_parsing.make_soup)
+        """
+        # Explicit stack instead of recursion so deeply nested pages are fine
+        stack = [(iter(soup.contents), None)]
+        while stack:
+            children, tag_name = stack[-1]
+            node = next(children, None)
+            if node is None:
+                stack.pop()
+                if tag_name is not None:
+                    self.handle_endtag(tag_name)
+            elif isinstance(node, Tag):
+                self.handle_starttag(node.name, [])
+                stack.append((iter(node.contents), node.name))
+            elif type(node) in TEXT_NODE_TYPES:
+                self.handle_data(str(node))
+
     def handle_starttag(self, tag, attrs):
         self.current_tag = tag  # Track the current tag
         if tag == 'p' or tag == 'a':
@@ -46,11 +114,11 @@ class MyHTMLParser(HTMLParser):
             if not self.company_name and self.headings:
                 self.company_name = self.headings[0]  # Select the first heading as the company name
             # Check for contact info (email, phone, address)
-            elif re.search(r'[\w\.-]+@[\w\.-]+', text):
+            elif CONTACT_EMAIL_RE.search(text):
                 self.contact_info.append(text)
-            elif re.search(r'\+?\d{1,4}?[-.\s]?\(?\d{1,3}?\)?[-.\s]?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,4}', text):
+            elif CONTACT_PHONE_RE.search(text):
                 self.contact_info.append(text)
-            elif re.search(r'\d{1,4}[\w\s]+[,\-.\d]*\s*(Street|Ave|Road|Boulevard|Lane)', text):
+            elif CONTACT_ADDRESS_RE.search(text):
                 self.contact_info.append(text)
             elif 'service' in text.lower():
                 self.services.append(text)
@@ -70,6 +138,69 @@ SOCIAL_MEDIA_PATTERNS = {
     'instagram': r'instagram\.com/[\w.-]+',
 }
 
+class EntityExtractor:
+    """
+    Finds every contact and social-media entity in one scan of the text
+
+    The patterns are compiled into a single alternation of zero-width lookaheads,
+    grouped into families behind a cheap zero-width lead (e.g. "starts with a
+    digit") so most positions are rejected by one check instead of one per pattern.
+    The scan only locates positions where some entity starts; every pattern is then
+    tried there on its own, so text matching several types (e.g. a phone inside an
+    address) is reported under each. The results match running re.findall once
+    per pattern.
+    """
+
+    def __init__(self, families):
+        """
+        Args:
+            families: List of (lead, patterns) pairs. lead is a zero-width
+                      assertion shared by the family ('' for none) and patterns a
+                      dict of entity name -> regex without capturing groups.
+        """
+        self.patterns = {}
+        alternatives = []
+        for lead, patterns in families:
+            self.patterns.update((name, re.compile(pattern)) for name, pattern in patterns.items())
+            branches = "|".join(f"(?={pattern})" for pattern in patterns.values())
+            alternatives.append(f"{lead}(?:{branches})")
+        self.regex = re.compile("|".join(alternatives))
+
+    def extract(self, text):
+        """
+        Scan text once for all entity types
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            dict: Entity name -> unique matches in order of first appearance
+        """
+        found = {name: {} for name in self.patterns}
+        # Like findall, a pattern's next match may not overlap its previous one
+        resume = dict.fromkeys(self.patterns, 0)
+        for match in self.regex.finditer(text):
+            position = match.start()
+            for name, pattern in self.patterns.items():
+                if position < resume[name]:
+                    continue
+                entity = pattern.match(text, position)
+                while entity:
+                    found[name][entity.group()] = None
+                    resume[name] = entity.end()
+                    # findall may match again right where it stopped, even where
+                    # the family's lead does not hold (e.g. mid-word for emails)
+                    entity = pattern.match(text, resume[name])
+        return {name: list(matches) for name, matches in found.items()}
+
+# Single-pass extractor used by extract_business_info. Emails are only located
+# from the start of a word: the same matches, without retrying inside every word.
+ENTITY_EXTRACTOR = EntityExtractor([
+    (f"(?=[{''.join(sorted({pattern[0] for pattern in SOCIAL_MEDIA_PATTERNS.values()}))}])", SOCIAL_MEDIA_PATTERNS),
+    (r'(?<![\w.-])', {'email': EMAIL_PATTERN}),
+    (r'(?=[+(\d])', {'address': f"(?i:{ADDRESS_PATTERN})", 'phone': PHONE_PATTERN}),
+])
+
 def extract_emails(text):
     """Extract email addresses from text"""
     emails = re.findall(EMAIL_PATTERN, text)
@@ -94,6 +225,41 @@ def extract_social_media(text):
             social_media[platform] = list(set(matches))
     return social_media
 
+# Script blocks whose text is worth scanning (structured data, not code)
+JSON_LD_TYPE = 'application/ld+json'
+
+def extract_page_text(soup):
+    """
+    Collect the parts of a page where contact details and profile links appear
+
+    Only text nodes, href attributes, meta tag content and JSON-LD blocks are
+    kept, so the extraction regexes never see scripts, styles, comments or
+    the rest of the markup.
+
+    Args:
+        soup: Parsed document
+
+    Returns:
+        str: The collected pieces, separated so no pattern can match across two of them
+    """
+    chunks = []
+    for node in soup.descendants:
+        if isinstance(node, Tag):
+            href = node.get('href')
+            if href and isinstance(href, str):
+                chunks.append(href)
+            if node.name == 'meta':
+                content = node.get('content')
+                if content and isinstance(content, str):
+                    chunks.append(content)
+        elif type(node) in (NavigableString, TemplateString):
+            if not node.isspace():
+                chunks.append(node)
+        elif type(node) is Script:
+            if (node.parent.get('type') or '').strip().lower() == JSON_LD_TYPE:
+                chunks.append(node)
+    return " |\n".join(chunks)
+
 def clean_text(text):
     """Clean text by removing extra whitespace and normalizing newlines"""
     if not text:
@@ -165,21 +331,63 @@ def extract_services_products(text, company_name):
     
     return services, products
 
-def extract_company_history(text, company_name):
-    """Extract company history, founding date, and other significant information"""
-    history_info = {}
-    
-    # Split text into paragraphs for analysis
-    paragraphs = re.split(r'\n+', text)
-    
-    # Look for founding date patterns
-    founding_date_patterns = [
+class PatternFamily:
+    """
+    Compiled history patterns that share a set of trigger keywords
+
+    None of the patterns can match a paragraph that contains none of the
+    keywords, so paragraphs are screened with cheap substring checks before the
+    (much more expensive) patterns are tried.
+    """
+
+    def __init__(self, keywords, patterns, prefilter=None):
+        """
+        Args:
+            keywords: Lower-case literals at least one of which every pattern needs
+                      in ASCII text
+            patterns: Pattern regexes, in priority order (matched case-insensitively)
+            prefilter: Regex for screening non-ASCII text (defaults to the keywords)
+        """
+        self.keywords = keywords
+        # Non-ASCII text can case-fold (and contain digits) in ways the plain
+        # keywords do not cover, so it is screened with re.I matching instead
+        if prefilter is None:
+            prefilter = '|'.join(re.escape(keyword) for keyword in keywords)
+        self.prefilter = re.compile(prefilter, re.I)
+        self.patterns = [re.compile(pattern, re.I) for pattern in patterns]
+
+    def candidates(self, paragraphs, prefilter=True):
+        """
+        Paragraphs that may match one of the patterns, in their original order
+
+        Args:
+            paragraphs: (paragraph, lower-cased paragraph or None) pairs from screen_paragraphs
+            prefilter: False to return every paragraph
+        """
+        if not prefilter:
+            return [para for para, _ in paragraphs]
+        found = []
+        for para, lowered in paragraphs:
+            if lowered is not None:
+                if any(keyword in lowered for keyword in self.keywords):
+                    found.append(para)
+            elif self.prefilter.search(para):
+                found.append(para)
+        return found
+
+def screen_paragraphs(paragraphs):
+    """Pair each paragraph with its lower-case form (None when it is not ASCII)"""
+    return [(para, para.lower() if para.isascii() else None) for para in paragraphs]
+
+FOUNDING_WORDS = r'(?:founded|established|started|launched|created|began|incorporated)'
+
+FOUNDING_PATTERNS = PatternFamily(
+    ['founded', 'established', 'started', 'launched', 'created', 'began', 'incorporated', 'since'],
+    [
         # Year only: "founded in 2010" or "established in 2010"
-        r'(?:founded|established|started|launched|created|began|incorporated)(?:\s+\w+){0,3}\s+in\s+(\d{4})',
+        FOUNDING_WORDS + r'(?:\s+\w+){0,3}\s+in\s+(\d{4})',
         # Month and year: "founded in January 2010"
-        r'(?:founded|established|started|launched|created|began|incorporated)(?:\s+\w+){0,3}\s+in\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{4})',
-        # Simple year search when company name is directly associated
-        r'(?:' + re.escape(company_name) + r')\s+(?:was|were)?\s+(?:founded|established|started|launched|created|began|incorporated)(?:\s+\w+){0,3}\s+in\s+(\d{4})',
+        FOUNDING_WORDS + r'(?:\s+\w+){0,3}\s+in\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{4})',
         # Simple founding statement
         r'(?:since|established|founded)\s+in\s+(\d{4})',
         # Founded by person in year
@@ -187,10 +395,106 @@ def extract_company_history(text, company_name):
         # Year directly with founding word
         r'(?:founded|established|started|created|began|incorporated):\s*(\d{4})',
     ]
+)
+
+# Position of the company-name pattern among the founding patterns
+COMPANY_FOUNDING_INDEX = 2
+
+@functools.lru_cache(maxsize=256)
+def company_founding_pattern(company_name):
+    """Simple year search when company name is directly associated"""
+    return re.compile(r'(?:' + re.escape(company_name) + r')\s+(?:was|were)?\s+' + FOUNDING_WORDS +
+                      r'(?:\s+\w+){0,3}\s+in\s+(\d{4})', re.I)
+
+FINANCIAL_PATTERNS = PatternFamily(
+    ['revenue', 'sales', 'turnover', 'funding', 'raised', 'investment', 'capital', 'series',
+     'valu', 'worth', 'market', '$', '€', '£', '¥'],
+    [
+        # Revenue patterns
+        r'(?:revenue|sales|turnover|annual\s+revenue)(?:\s+\w+){0,3}\s+(?:of|is|was|reached|exceeded|approximately|about|around|nearly|over)?\s+(?:\$|€|£|¥)?(\d+(?:[\.,]\d+)?)\s*(?:million|billion|trillion|m|b|t|M|B|T)',
+        # Funding patterns
+        r'(?:funding|raised|investment|capital|series\s+[a-z])(?:\s+\w+){0,3}\s+(?:of|totaling|totalling|reaching|approximately|about|around|nearly|over)?\s+(?:\$|€|£|¥)?(\d+(?:[\.,]\d+)?)\s*(?:million|billion|trillion|m|b|t|M|B|T)',
+        # Valuation patterns
+        r'(?:valued|valuation|worth|market\s+cap)(?:\s+\w+){0,3}\s+(?:of|at|approximately|about|around|nearly|over)?\s+(?:\$|€|£|¥)?(\d+(?:[\.,]\d+)?)\s*(?:million|billion|trillion|m|b|t|M|B|T)',
+        # Direct currency amounts
+        r'(?:\$|€|£|¥)(\d+(?:[\.,]\d+)?)\s*(?:million|billion|trillion|m|b|t|M|B|T)',
+    ]
+)
+
+EMPLOYEE_PATTERNS = PatternFamily(
+    ['employ', 'team', 'staff', 'workforce', 'headcount', 'size'],
+    [
+        r'(?:employs|employees|team|staff|workforce)(?:\s+\w+){0,3}\s+(?:of|approximately|about|around|nearly|over|more\s+than)?\s+(\d{1,3}(?:,\d{3})*)\s+(?:people|employees|members|professionals|individuals|staff)',
+        r'(?:employs|employees|team|staff|workforce|headcount)(?:\s+\w+){0,3}\s+(?:of|approximately|about|around|nearly|over|more\s+than)?\s+(\d{1,3}(?:,\d{3})*)',
+        r'(?:company\s+size|size|headcount)(?:\s*:)?\s*(\d{1,3}(?:,\d{3})*\s*-\s*\d{1,3}(?:,\d{3})*)',
+        r'(?:company\s+size|size|headcount)(?:\s*:)?\s*(\d{1,3}(?:,\d{3})*\+?)',
+    ]
+)
+
+FOUNDER_PATTERNS = PatternFamily(
+    ['founded', 'established', 'started', 'created', 'began', 'founder', 'creator'],
+    [
+        r'(?:founded|established|started|created|began)(?:\s+by\s+)((?:[A-Z][a-z]+ [A-Z][a-z]+)(?:,? (?:and )?))+',
+        r'(?:founder|co-founder|creator)(?:s)?\s+(?:is|are|was|were)\s+((?:[A-Z][a-z]+ [A-Z][a-z]+)(?:,? (?:and )?))+',
+        r'(?:founder|co-founder|creator)(?:s)?\s*(?::|-)?\s*((?:[A-Z][a-z]+ [A-Z][a-z]+)(?:,? (?:and )?))+',
+    ]
+)
+
+ACQUISITION_PATTERNS = PatternFamily(
+    ['acquired', 'purchase', 'bought', 'taken', 'takeover', 'acquisition', 'merger'],
+    [
+        r'(?:acquired|purchased|bought|taken\s+over)(?:\s+by\s+)((?:[A-Z][a-z]+ )+)(?:\s+\w+){0,5}\s+in\s+(\d{4})',
+        r'(?:acquisition|purchase|takeover|merger)(?:\s+\w+){0,3}\s+by\s+((?:[A-Z][a-z]+ )+)',
+        r'(?:acquired|purchased|bought|takeover|acquisition)\s+(?:of|by)\s+((?:[A-Z][a-z]+ )+)',
+    ]
+)
+
+# Every industry pattern ends in (or starts with) one of these words
+INDUSTRY_PATTERNS = PatternFamily(
+    ['industry', 'sector', 'market'],
+    [
+        r'(?:industry|sector)(?:\s*:)?\s*([A-Za-z, &]+)',
+        r'(?:specializes|specializes\s+in|focuses\s+on)(?:\s+the)?\s+([A-Za-z, &]+)\s+(?:industry|sector)',
+        r'(?:leading|top)(?:\s+the)?\s+([A-Za-z, &]+)\s+(?:industry|sector|market)',
+    ]
+)
+
+# Every milestone pattern needs a year (ASCII text is screened for any digit)
+MILESTONE_PATTERNS = PatternFamily(
+    list('0123456789'),
+    [
+        r'(?:timeline|milestones|history)(?:\s*:)?\s*([^\.]+\d{4}[^\.]+)',
+        r'(?:in\s+)(\d{4})(?:,?\s+)([^\.]+)',
+    ],
+    prefilter=r'\d{4}'
+)
+
+def extract_company_history(text, company_name, prefilter=True):
+    """
+    Extract company history, founding date, and other significant information
+
+    Args:
+        text: Main page text
+        company_name: Company name (used by one of the founding-date patterns)
+        prefilter: Screen paragraphs by keyword before running each pattern family
+                   (False runs every pattern on every paragraph; same result, slower)
+
+    Returns:
+        dict: History fields that were found
+    """
+    history_info = {}
+    
+    # Split text into paragraphs for analysis
+    paragraphs = screen_paragraphs(re.split(r'\n+', text))
+    
+    # Look for founding date patterns
+    founding_date_patterns = list(FOUNDING_PATTERNS.patterns)
+    founding_date_patterns.insert(COMPANY_FOUNDING_INDEX, company_founding_pattern(company_name))
+    candidates = FOUNDING_PATTERNS.candidates(paragraphs, prefilter)
     
     for pattern in founding_date_patterns:
-        for para in paragraphs:
-            matches = re.search(pattern, para, re.I)
+        for para in candidates:
+            matches = pattern.search(para)
             if matches:
                 founding_year = matches.group(1)
                 history_info['founding_year'] = founding_year
@@ -200,79 +504,48 @@ def extract_company_history(text, company_name):
             break
     
     # Look for revenue/funding information
-    financial_patterns = [
-        # Revenue patterns
-        r'(?:revenue|sales|turnover|annual\s+revenue)(?:\s+\w+){0,3}\s+(?:of|is|was|reached|exceeded|approximately|about|around|nearly|over)?\s+(?:\$|€|£|¥)?(\d+(?:[\.,]\d+)?)\s*(?:million|billion|trillion|m|b|t|M|B|T)',
-        # Funding patterns
-        r'(?:funding|raised|investment|capital|series\s+[a-z])(?:\s+\w+){0,3}\s+(?:of|totaling|totalling|reaching|approximately|about|around|nearly|over)?\s+(?:\$|€|£|¥)?(\d+(?:[\.,]\d+)?)\s*(?:million|billion|trillion|m|b|t|M|B|T)',
-        # Valuation patterns
-        r'(?:valued|valuation|worth|market\s+cap)(?:\s+\w+){0,3}\s+(?:of|at|approximately|about|around|nearly|over)?\s+(?:\$|€|£|¥)?(\d+(?:[\.,]\d+)?)\s*(?:million|billion|trillion|m|b|t|M|B|T)',
-        # Direct currency amounts
-        r'(?:\$|€|£|¥)(\d+(?:[\.,]\d+)?)\s*(?:million|billion|trillion|m|b|t|M|B|T)',
-    ]
-    
-    for pattern in financial_patterns:
-        for para in paragraphs:
-            matches = re.search(pattern, para, re.I)
+    candidates = FINANCIAL_PATTERNS.candidates(paragraphs, prefilter)
+    for pattern in FINANCIAL_PATTERNS.patterns:
+        for para in candidates:
+            matches = pattern.search(para)
             if matches and 'financial_info' not in history_info:
                 history_info['financial_info'] = clean_text(para)
                 break
     
     # Look for employee count
-    employee_patterns = [
-        r'(?:employs|employees|team|staff|workforce)(?:\s+\w+){0,3}\s+(?:of|approximately|about|around|nearly|over|more\s+than)?\s+(\d{1,3}(?:,\d{3})*)\s+(?:people|employees|members|professionals|individuals|staff)',
-        r'(?:employs|employees|team|staff|workforce|headcount)(?:\s+\w+){0,3}\s+(?:of|approximately|about|around|nearly|over|more\s+than)?\s+(\d{1,3}(?:,\d{3})*)',
-        r'(?:company\s+size|size|headcount)(?:\s*:)?\s*(\d{1,3}(?:,\d{3})*\s*-\s*\d{1,3}(?:,\d{3})*)',
-        r'(?:company\s+size|size|headcount)(?:\s*:)?\s*(\d{1,3}(?:,\d{3})*\+?)',
-    ]
-    
-    for pattern in employee_patterns:
-        for para in paragraphs:
-            matches = re.search(pattern, para, re.I)
+    candidates = EMPLOYEE_PATTERNS.candidates(paragraphs, prefilter)
+    for pattern in EMPLOYEE_PATTERNS.patterns:
+        for para in candidates:
+            matches = pattern.search(para)
             if matches and 'employee_count' not in history_info:
                 history_info['employee_count'] = matches.group(1)
                 history_info['employee_context'] = clean_text(para)
                 break
     
     # Look for founders information
-    founder_patterns = [
-        r'(?:founded|established|started|created|began)(?:\s+by\s+)((?:[A-Z][a-z]+ [A-Z][a-z]+)(?:,? (?:and )?))+',
-        r'(?:founder|co-founder|creator)(?:s)?\s+(?:is|are|was|were)\s+((?:[A-Z][a-z]+ [A-Z][a-z]+)(?:,? (?:and )?))+',
-        r'(?:founder|co-founder|creator)(?:s)?\s*(?::|-)?\s*((?:[A-Z][a-z]+ [A-Z][a-z]+)(?:,? (?:and )?))+',
-    ]
-    
-    for pattern in founder_patterns:
-        for para in paragraphs:
-            matches = re.search(pattern, para, re.I)
+    candidates = FOUNDER_PATTERNS.candidates(paragraphs, prefilter)
+    for pattern in FOUNDER_PATTERNS.patterns:
+        for para in candidates:
+            matches = pattern.search(para)
             if matches and 'founders' not in history_info:
                 history_info['founders'] = matches.group(1).strip()
                 history_info['founder_context'] = clean_text(para)
                 break
     
     # Look for acquisition information
-    acquisition_patterns = [
-        r'(?:acquired|purchased|bought|taken\s+over)(?:\s+by\s+)((?:[A-Z][a-z]+ )+)(?:\s+\w+){0,5}\s+in\s+(\d{4})',
-        r'(?:acquisition|purchase|takeover|merger)(?:\s+\w+){0,3}\s+by\s+((?:[A-Z][a-z]+ )+)',
-        r'(?:acquired|purchased|bought|takeover|acquisition)\s+(?:of|by)\s+((?:[A-Z][a-z]+ )+)',
-    ]
-    
-    for pattern in acquisition_patterns:
-        for para in paragraphs:
-            matches = re.search(pattern, para, re.I)
+    candidates = ACQUISITION_PATTERNS.candidates(paragraphs, prefilter)
+    for pattern in ACQUISITION_PATTERNS.patterns:
+        for para in candidates:
+            matches = pattern.search(para)
             if matches and 'acquisition_info' not in history_info:
                 history_info['acquisition_info'] = clean_text(para)
                 break
     
     # Look for industry/sector information
-    industry_patterns = [
-        r'(?:industry|sector)(?:\s*:)?\s*([A-Za-z, &]+)',
-        r'(?:specializes|specializes\s+in|focuses\s+on)(?:\s+the)?\s+([A-Za-z, &]+)\s+(?:industry|sector)',
-        r'(?:leading|top)(?:\s+the)?\s+([A-Za-z, &]+)\s+(?:industry|sector|market)',
-    ]
-    
-    for pattern in industry_patterns:
-        for para in paragraphs:
-            matches = re.search(pattern, para, re.I)
+    candidates = INDUSTRY_PATTERNS.candidates(paragraphs, prefilter)
+    for pattern in INDUSTRY_PATTERNS.patterns:
+        for para in candidates:
+            matches = pattern.search(para)
             if matches and 'industry' not in history_info:
                 industry = matches.group(1).strip()
                 if 5 < len(industry) < 100:  # Reasonable length for industry name
@@ -280,15 +553,11 @@ def extract_company_history(text, company_name):
                     break
     
     # Look for timeline and milestones
-    milestone_patterns = [
-        r'(?:timeline|milestones|history)(?:\s*:)?\s*([^\.]+\d{4}[^\.]+)',
-        r'(?:in\s+)(\d{4})(?:,?\s+)([^\.]+)',
-    ]
-    
+    candidates = MILESTONE_PATTERNS.candidates(paragraphs, prefilter)
     milestones = []
-    for pattern in milestone_patterns:
-        for para in paragraphs:
-            matches = re.findall(pattern, para, re.I)
+    for pattern in MILESTONE_PATTERNS.patterns:
+        for para in candidates:
+            matches = pattern.findall(para)
             if matches:
                 for match in matches:
                     if isinstance(match, tuple):
@@ -774,10 +1043,200 @@ def extract_linkedin_company_info(soup, url, text):
     logger.info(f"Extracted LinkedIn data: {', '.join(linkedin_info.keys())}")
     return linkedin_info
 
+def extract_business_info(html_content, clean_content, url, timings=None):
+    """
+    Extract business information from a downloaded page
+    
+    Args:
+        html_content: Page HTML
+        clean_content: Main text extracted by trafilatura
+        url: Page URL
+        timings: Optional dict that receives per-stage wall times in seconds
+        
+    Returns:
+        dict: Company name, description, contact info, services, products,
+              keywords, company history and LinkedIn data
+    """
+    if timings is None:
+        timings = {}
+    domain_name = urlparse(url).netloc
+    
+    # Parse with both parsers for better results
+    stage_start = time.perf_counter()
+    soup = make_soup(html_content)
+    
+    # Run our custom HTML parser over the same tree instead of re-tokenizing
+    parser = MyHTMLParser()
+    parser.feed_soup(soup)
+    timings['html_parsing'] = time.perf_counter() - stage_start
+    
+    # Extract business information from both methods
+    stage_start = time.perf_counter()
+    company_name = extract_company_name(soup, domain_name)
+    # If company name not found with BeautifulSoup, try the HTML parser
+    if company_name == "Unknown Company" and parser.company_name:
+        company_name = parser.company_name
+    
+    # Extract contact information from both visible text and metadata
+    meta_description = soup.find('meta', attrs={'name': 'description'})
+    meta_text = ""
+    if meta_description and meta_description.has_attr('content'):
+        meta_text = meta_description['content']
+    
+    full_text = f"{clean_content} {meta_text} {extract_page_text(soup)}"
+    
+    entities = ENTITY_EXTRACTOR.extract(full_text)
+    emails = entities['email']
+    phones = entities['phone']
+    addresses = entities['address']
+    social_media = {platform: entities[platform] for platform in SOCIAL_MEDIA_PATTERNS
+                    if entities[platform]}
+    
+    # Add any contact info from HTML parser
+    parsed_contacts = parser.contact_info
+    for contact in parsed_contacts:
+        # Check for email pattern
+        email_match = re.search(EMAIL_PATTERN, contact)
+        if email_match:
+            emails.append(email_match.group(0))
+            continue
+            
+        # Check for phone pattern
+        phone_match = re.search(PHONE_PATTERN, contact)
+        if phone_match:
+            phones.append(phone_match.group(0))
+            continue
+            
+        # Check for address pattern
+        addr_match = re.search(ADDRESS_PATTERN, contact, re.IGNORECASE)
+        if addr_match:
+            addresses.append(addr_match.group(0))
+    
+    # Remove duplicates
+    emails = list(set(emails))
+    phones = list(set(phones))
+    addresses = list(set(addresses))
+    
+    # Extract services and products from clean content and parser
+    bs_services, bs_products = extract_services_products(clean_content, company_name)
+    
+    # Combine services and products from both methods
+    services = bs_services
+    products = bs_products
+    
+    # Add services and products from HTML parser
+    services.extend([s for s in parser.services if s not in services])
+    products.extend([p for p in parser.products if p not in products])
+    
+    # Limit to top 5 most relevant services and products
+    services = services[:5]
+    products = products[:5]
+    
+    # Get meta keywords
+    meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
+    keywords = []
+    if meta_keywords and meta_keywords.has_attr('content'):
+        content = meta_keywords['content']
+        if content and isinstance(content, str):
+            keywords = [k.strip() for k in content.split(',')]
+    
+    # Get business description
+    description = ""
+    about_section = soup.find(id=re.compile(r'about', re.I)) or \
+                    soup.find('section', class_=re.compile(r'about', re.I)) or \
+                    soup.find('div', class_=re.compile(r'about', re.I))
+    
+    if about_section:
+        description = clean_text(about_section.get_text())
+    
+    if not description and meta_description and meta_description.has_attr('content'):
+        description = meta_description['content']
+    
+    # Extract company history information
+    company_history = extract_company_history(clean_content, company_name)
+    
+    timings['data_extraction'] = time.perf_counter() - stage_start
+    
+    # Check if this is a LinkedIn page and extract specialized info
+    stage_start = time.perf_counter()
+    linkedin_info = extract_linkedin_company_info(soup, url, clean_content)
+    timings['linkedin_extraction'] = time.perf_counter() - stage_start
+    
+    # If LinkedIn data is available, enhance our company history data
+    if linkedin_info:
+        # Use LinkedIn company name if available
+        if 'company_name' in linkedin_info and linkedin_info['company_name']:
+            company_name = linkedin_info['company_name']
+        
+        # Add founding year if available from LinkedIn but not from general extraction
+        if 'founded' in linkedin_info and 'founding_year' not in company_history:
+            company_history['founding_year'] = linkedin_info['founded']
+            company_history['founding_context'] = f"Founded in {linkedin_info['founded']}"
+        
+        # Add company size if available
+        if 'company_size' in linkedin_info and 'employee_count' not in company_history:
+            company_history['employee_count'] = linkedin_info['company_size']
+            company_history['employee_context'] = f"Company size: {linkedin_info['company_size']}"
+        
+        # Add industry if available
+        if 'industry' in linkedin_info and 'industry' not in company_history:
+            company_history['industry'] = linkedin_info['industry']
+        
+        # Add LinkedIn-specific information to the result
+        if 'specialties' in linkedin_info:
+            company_history['specialties'] = linkedin_info['specialties']
+        
+        if 'headquarters' in linkedin_info:
+            company_history['headquarters'] = linkedin_info['headquarters']
+        
+        if 'follower_count' in linkedin_info:
+            company_history['linkedin_followers'] = linkedin_info['follower_count']
+        
+        if 'funding' in linkedin_info and 'financial_info' not in company_history:
+            company_history['financial_info'] = linkedin_info['funding']
+    
+    # Combine everything into a result dictionary
+    result = {
+        'company_name': company_name,
+        'description': description[:500] if description else "",
+        'contact_info': {
+            'emails': emails,
+            'phones': phones,
+            'addresses': addresses,
+            'social_media': social_media
+        },
+        'services': services,
+        'products': products,
+        'keywords': keywords,
+        'company_history': company_history,
+        'url': url,
+        'domain': domain_name
+    }
+    
+    # Add LinkedIn-specific full data section if available
+    if linkedin_info:
+        result['linkedin_data'] = linkedin_info
+    
+    return result
+
 def scrape_website(url):
-    """Scrape website and extract business information"""
+    """
+    Scrape website and extract business information
+    
+    Concurrent calls for the same canonical URL wait for one scrape and each get
+    their own copy of its result.
+    """
+    result = SCRAPE_FLIGHTS.do(canonical_key(url), _scrape_website, url)
+    return copy.deepcopy(result)
+
+def _scrape_website(url):
+    """Scrape website and extract business information (see scrape_website)"""
     logger.info(f"Starting scrape of URL: {url}")
     
+    # Per-stage wall time in seconds, returned with the result
+    timings = {}
+    scrape_start = time.perf_counter()
+    
     try:
         # Parse domain for later use
         parsed_url = urlparse(url)
@@ -787,9 +1246,13 @@ def scrape_website(url):
         is_linkedin = 'linkedin.com' in url.lower()
         
         try:
-            # Use trafilatura to get clean text
-            downloaded = trafilatura.fetch_url(url)
-            if not downloaded:
+            # Download the page once; trafilatura, BeautifulSoup and the custom
+            # parser all work from this single response
+            stage_start = time.perf_counter()
+            page = fetch_page(url)
+            timings['fetch'] = time.perf_counter() - stage_start
+            
+            if not page:
                 logger.error(f"Failed to download URL: {url}")
                 # If LinkedIn page but download failed, provide a specific message
                 if is_linkedin:
@@ -802,8 +1265,36 @@ def scrape_website(url):
                     }
                 return None
             
-            # Extract clean text for analysis
-            clean_content = trafilatura.extract(downloaded)
+            # Identical bytes (including a 304 that reused the stored body) give an
+            # identical result, so skip parsing if this page was extracted before
+            result_key = result_cache_key(url, page['content'])
+            previous = RESULT_CACHE.get(result_key)
+            if previous is None:
+                previous = disk_cache.cache.lookup_result(result_key)
+                if previous is not None:
+                    RESULT_CACHE.set(result_key, previous)
+            if previous is not None:
+                logger.info(f"Page unchanged, reusing previous result for: {url}")
+                result = json.loads(json.dumps(previous))
+                result['url'] = url
+                result['domain'] = domain_name
+                if page.get('not_modified'):
+                    result['not_modified'] = True
+                if page.get('truncated'):
+                    result['truncated'] = True
+                timings['total'] = time.perf_counter() - scrape_start
+                result['timings'] = {stage: round(seconds, 4) for stage, seconds in timings.items()}
+                return result
+            
+            html_content = page['text']
+            
+            # Extract clean text for analysis (trafilatura is slow to import, so
+            # it is only loaded once a page actually needs it)
+            import trafilatura
+            stage_start = time.perf_counter()
+            clean_content = trafilatura.extract(html_content)
+            timings['content_extraction'] = time.perf_counter() - stage_start
+            
             if not clean_content:
                 logger.error(f"Failed to extract content from URL: {url}")
                 # LinkedIn-specific handling for content extraction failures
@@ -831,165 +1322,18 @@ def scrape_website(url):
             # Re-raise for other URLs
             raise
         
-        # Use BeautifulSoup for structured parsing
-        headers = {
-            'User-Agent': (
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-                'AppleWebKit/537.36 (KHTML, like Gecko) '
-                'Chrome/123.0.0.0 Safari/537.36'
-            )
-        }
-        
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=10) as response:
-            html_content = response.read().decode('utf-8', errors='replace')
-        
-        # Parse with both parsers for better results
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Use our custom HTML parser as well
-        parser = MyHTMLParser()
-        parser.feed(html_content)
-        
-        # Extract business information from both methods
-        company_name = extract_company_name(soup, domain_name)
-        # If company name not found with BeautifulSoup, try the HTML parser
-        if company_name == "Unknown Company" and parser.company_name:
-            company_name = parser.company_name
-        
-        # Extract contact information from both visible text and metadata
-        meta_description = soup.find('meta', attrs={'name': 'description'})
-        meta_text = ""
-        if meta_description and meta_description.has_attr('content'):
-            meta_text = meta_description['content']
-        
-        full_text = f"{clean_content} {meta_text} {str(soup)}"
-        
-        emails = extract_emails(full_text)
-        phones = extract_phones(full_text)
-        addresses = extract_addresses(full_text)
-        social_media = extract_social_media(full_text)
-        
-        # Add any contact info from HTML parser
-        parsed_contacts = parser.contact_info
-        for contact in parsed_contacts:
-            # Check for email pattern
-            email_match = re.search(EMAIL_PATTERN, contact)
-            if email_match:
-                emails.append(email_match.group(0))
-                continue
-                
-            # Check for phone pattern
-            phone_match = re.search(PHONE_PATTERN, contact)
-            if phone_match:
-                phones.append(phone_match.group(0))
-                continue
-                
-            # Check for address pattern
-            addr_match = re.search(ADDRESS_PATTERN, contact, re.IGNORECASE)
-            if addr_match:
-                addresses.append(addr_match.group(0))
-        
-        # Remove duplicates
-        emails = list(set(emails))
-        phones = list(set(phones))
-        addresses = list(set(addresses))
-        
-        # Extract services and products from clean content and parser
-        bs_services, bs_products = extract_services_products(clean_content, company_name)
-        
-        # Combine services and products from both methods
-        services = bs_services
-        products = bs_products
-        
-        # Add services and products from HTML parser
-        services.extend([s for s in parser.services if s not in services])
-        products.extend([p for p in parser.products if p not in products])
+        result = extract_business_info(html_content, clean_content, url, timings)
         
-        # Limit to top 5 most relevant services and products
-        services = services[:5]
-        products = products[:5]
+        # Keep the result so the same page bytes never need parsing again
+        RESULT_CACHE.set(result_key, dict(result))
+        disk_cache.cache.store_result(result_key, result)
         
-        # Get meta keywords
-        meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-        keywords = []
-        if meta_keywords and meta_keywords.has_attr('content'):
-            content = meta_keywords['content']
-            if content and isinstance(content, str):
-                keywords = [k.strip() for k in content.split(',')]
+        # Extracted from the first MAX_PAGE_BYTES only (see http_client)
+        if page.get('truncated'):
+            result['truncated'] = True
         
-        # Get business description
-        description = ""
-        about_section = soup.find(id=re.compile(r'about', re.I)) or \
-                        soup.find('section', class_=re.compile(r'about', re.I)) or \
-                        soup.find('div', class_=re.compile(r'about', re.I))
-        
-        if about_section:
-            description = clean_text(about_section.get_text())
-        
-        if not description and meta_description and meta_description.has_attr('content'):
-            description = meta_description['content']
-        
-        # Extract company history information
-        company_history = extract_company_history(clean_content, company_name)
-        
-        # Check if this is a LinkedIn page and extract specialized info
-        linkedin_info = extract_linkedin_company_info(soup, url, clean_content)
-        
-        # If LinkedIn data is available, enhance our company history data
-        if linkedin_info:
-            # Use LinkedIn company name if available
-            if 'company_name' in linkedin_info and linkedin_info['company_name']:
-                company_name = linkedin_info['company_name']
-            
-            # Add founding year if available from LinkedIn but not from general extraction
-            if 'founded' in linkedin_info and 'founding_year' not in company_history:
-                company_history['founding_year'] = linkedin_info['founded']
-                company_history['founding_context'] = f"Founded in {linkedin_info['founded']}"
-            
-            # Add company size if available
-            if 'company_size' in linkedin_info and 'employee_count' not in company_history:
-                company_history['employee_count'] = linkedin_info['company_size']
-                company_history['employee_context'] = f"Company size: {linkedin_info['company_size']}"
-            
-            # Add industry if available
-            if 'industry' in linkedin_info and 'industry' not in company_history:
-                company_history['industry'] = linkedin_info['industry']
-            
-            # Add LinkedIn-specific information to the result
-            if 'specialties' in linkedin_info:
-                company_history['specialties'] = linkedin_info['specialties']
-            
-            if 'headquarters' in linkedin_info:
-                company_history['headquarters'] = linkedin_info['headquarters']
-            
-            if 'follower_count' in linkedin_info:
-                company_history['linkedin_followers'] = linkedin_info['follower_count']
-            
-            if 'funding' in linkedin_info and 'financial_info' not in company_history:
-                company_history['financial_info'] = linkedin_info['funding']
-        
-        # Combine everything into a result dictionary
-        result = {
-            'company_name': company_name,
-            'description': description[:500] if description else "",
-            'contact_info': {
-                'emails': emails,
-                'phones': phones,
-                'addresses': addresses,
-                'social_media': social_media
-            },
-            'services': services,
-            'products': products,
-            'keywords': keywords,
-            'company_history': company_history,
-            'url': url,
-            'domain': domain_name
-        }
-        
-        # Add LinkedIn-specific full data section if available
-        if linkedin_info:
-            result['linkedin_data'] = linkedin_info
+        timings['total'] = time.perf_counter() - scrape_start
+        result['timings'] = {stage: round(seconds, 4) for stage, seconds in timings.items()}
         
         logger.info(f"Successfully scraped {url}")
         return result
@@ -997,3 +1341,17 @@ def scrape_website(url):
     except Exception as e:
         logger.error(f"Error during scraping: {str(e)}")
         return None
+
+async def scrape_website_async(url, engine=None):
+    """
+    Async variant of scrape_website that respects the engine's concurrency limits
+    
+    Args:
+        url: URL to scrape
+        engine: FetchEngine to run on (a new one is created if omitted)
+        
+    Returns:
+        dict: Same result as scrape_website
+    """
+    engine = engine or FetchEngine()
+    return await engine.run(url, scrape_website, url)
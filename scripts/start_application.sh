@@ -26,7 +26,7 @@ fi
 
 # Start application with gunicorn
 echo "Starting application with gunicorn on port $PORT"
-gunicorn --bind 0.0.0.0:$PORT --workers 3 --timeout 120 --access-logfile=- --error-logfile=- main:app
+gunicorn --config gunicorn.conf.py --bind 0.0.0.0:$PORT main:app
 
 # Exit with gunicorn's exit code
 exit $?
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+Section Selection Utilities
+
+This module parses the optional 'sections' argument of the LinkedIn extractors:
+1. Accepts a list of names or a comma-separated string ("about,jobs")
+2. Defaults to every section the extractor knows
+3. Rejects unknown names instead of silently dropping them
+"""
+
+def parse_sections(sections, known):
+    """
+    Turn a requested set of sections into a validated list
+
+    Args:
+        sections: None, a list of section names, or a comma-separated string
+        known: Section names the extractor supports (e.g. its SECTION_EXTRACTORS)
+
+    Returns:
+        list: Requested section names without duplicates, or all known names
+              if none were requested
+
+    Raises:
+        ValueError: If a requested name is not in known
+    """
+    if isinstance(sections, str):
+        sections = [section.strip() for section in sections.split(',')]
+    elif sections is not None and not isinstance(sections, (list, tuple, set, frozenset)):
+        raise ValueError('Sections must be a list or a comma-separated string')
+    sections = [section for section in (sections or []) if section] or list(known)
+
+    unknown_sections = [section for section in sections if section not in known]
+    if unknown_sections:
+        raise ValueError(f"Unknown sections: {', '.join(map(str, unknown_sections))}")
+
+    return list(dict.fromkeys(sections))
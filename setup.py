@@ -18,6 +18,7 @@ setup(
         "flask>=3.1.0",
         "flask-sqlalchemy>=3.1.1",
         "gunicorn>=23.0.0",
+        "lxml>=5.4.0",
         "pip-tools>=7.4.1",
         "psycopg2-binary>=2.9.10",
         "requests>=2.32.3",
@@ -0,0 +1,90 @@
+"""
+Single-Flight Call Coalescing
+
+When several threads ask for the same key at the same time, only the first one
+runs the call; the others wait for it and share its result (or its exception).
+Once the call finishes the key is released, so later calls run again (caching is
+left to the caller).
+"""
+
+import logging
+import threading
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class _Call:
+    """One in-progress call and the threads waiting for it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key
+    """
+
+    def __init__(self, name='singleflight'):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run func once per key among concurrent callers
+
+        Args:
+            key: Hashable key identifying identical calls
+            func: Function to run
+            *args, **kwargs: Arguments for func
+
+        Returns:
+            Whatever func returned for the call that actually ran
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            logger.debug(f"{self.name}: waiting on in-flight call for {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        """Number of keys currently being computed"""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """
+        Get coalescing counters
+
+        Returns:
+            dict: in_flight keys and total coalesced calls
+        """
+        with self._lock:
+            return {'in_flight': len(self._calls), 'coalesced': self.coalesced}
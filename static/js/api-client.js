@@ -88,10 +88,66 @@ async function processBatchUrls(urls, format = 'json') {
     }
 }
 
+// Function to process batch URLs, calling onResult as each URL finishes
+async function streamBatchUrls(urls, onResult, mode = 'find_linkedin', useAuth = false) {
+    try {
+        const apiUrl = `${getApiBaseUrl()}/api/batch`;
+        const response = await fetch(apiUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'application/x-ndjson',
+            },
+            body: JSON.stringify({ urls, mode, use_auth: useAuth, stream: 'ndjson' }),
+            credentials: 'same-origin'
+        });
+        
+        if (!response.ok) {
+            throw new Error(`HTTP error! Status: ${response.status}`);
+        }
+        
+        // Each line is one JSON record; the last one is the {done: true} summary
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let summary = null;
+        
+        const handleLine = (line) => {
+            if (!line.trim()) {
+                return;
+            }
+            const record = JSON.parse(line);
+            if (record.done) {
+                summary = record;
+            } else {
+                onResult(record);
+            }
+        };
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.forEach(handleLine);
+        }
+        handleLine(buffer + decoder.decode());
+        
+        return summary;
+    } catch (error) {
+        console.error('Error streaming batch URLs:', error);
+        throw error;
+    }
+}
+
 // Export the API functions
 window.ApiClient = {
     scrapeLinkedInUrl,
     findLinkedInUrl,
     processBatchUrls,
+    streamBatchUrls,
     isAmplifyDeployment
 };
\ No newline at end of file
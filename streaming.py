@@ -0,0 +1,84 @@
+"""
+Streaming Batch Responses
+
+This module turns a batch into a streamed HTTP response, shared by the API
+blueprint and the standalone app:
+1. The format comes from the request body ("stream") or the Accept header
+2. Results are sent one per URL as soon as they finish (NDJSON or Server-Sent Events)
+3. Each distinct site is fetched once and its result sent for every matching input
+"""
+
+import json
+from flask import Response, request
+from fetch_engine import iter_completed
+from url_utils import dedupe_urls
+
+def get_stream_format(data):
+    """
+    Get the streaming format requested for a batch
+    
+    Args:
+        data: Request JSON body
+        
+    Returns:
+        str: 'ndjson', 'sse', or None for a regular JSON response
+    """
+    stream = data.get('stream')
+    if stream in ('ndjson', 'sse'):
+        return stream
+    if 'text/event-stream' in request.headers.get('Accept', ''):
+        return 'sse'
+    if stream or 'application/x-ndjson' in request.headers.get('Accept', ''):
+        return 'ndjson'
+    return None
+
+def stream_batch(func, urls, stream_format='ndjson'):
+    """
+    Stream batch results one per URL, in completion order
+    
+    Each record carries the URL's 'index' in the request. Each distinct site is
+    fetched once; inputs that canonicalize to the same URL get their records when
+    it finishes. A final summary record (SSE event 'done') carries the totals.
+    
+    Args:
+        func: Blocking function that takes a URL and returns a result dict
+        urls: URLs to process
+        stream_format: 'ndjson' for one JSON object per line, 'sse' for Server-Sent Events
+        
+    Returns:
+        Response: Streaming response
+    """
+    def encode(record, event):
+        payload = json.dumps(record)
+        if stream_format == 'sse':
+            return f"event: {event}\ndata: {payload}\n\n"
+        return payload + "\n"
+    
+    # Fetch each distinct site once, then fan results back out to every input
+    unique_urls, positions = dedupe_urls(urls)
+    inputs = [[] for _ in unique_urls]
+    for index, position in enumerate(positions):
+        inputs[position].append(index)
+    
+    def generate():
+        successful = 0
+        for position, url, result in iter_completed(func, unique_urls):
+            if isinstance(result, Exception):
+                result = {'success': False, 'url': url, 'error': str(result)}
+            for index in inputs[position]:
+                if result.get('success', False):
+                    successful += 1
+                yield encode({'index': index, **result}, 'result')
+        
+        yield encode({
+            'done': True,
+            'total': len(urls),
+            'successful': successful,
+            'failed': len(urls) - successful
+        }, 'done')
+    
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    return Response(generate(), mimetype=mimetype, headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
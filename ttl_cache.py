@@ -0,0 +1,163 @@
+"""
+Bounded TTL Cache
+
+This module provides the in-memory cache used for fetched pages:
+1. LRU eviction bounded by both entry count and total size in bytes
+2. A time-to-live per entry so stale pages expire
+3. Hit, miss, eviction and expiration counters
+4. A single lock, so one instance can be shared by all request threads
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+def estimate_size(value):
+    """
+    Estimate how many bytes a cached value holds
+
+    Args:
+        value: str, bytes, or a dict/list of them
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(v) for v in value)
+    return 64
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry expiry and a byte budget
+
+    Args:
+        max_entries: Maximum number of entries kept
+        max_bytes: Maximum total estimated size of all values
+        ttl: Default time-to-live in seconds (None means entries never expire)
+    """
+
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024, ttl=600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key):
+        """Drop an entry; the caller holds the lock"""
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key, default=None):
+        """
+        Look up a key, refreshing its LRU position
+
+        Args:
+            key: Cache key
+            default: Returned when the key is missing or expired
+
+        Returns:
+            The cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, _, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None, size=None):
+        """
+        Store a value, evicting least recently used entries to stay within bounds
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds for this entry (defaults to the cache TTL)
+            size: Size in bytes (estimated from the value if omitted)
+        """
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def __getitem__(self, key):
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def pop(self, key, default=None):
+        """Remove a key and return its value (or default)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Get cache counters
+
+        Returns:
+            dict: entries, bytes, hits, misses, evictions and expirations
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
@@ -0,0 +1,118 @@
+"""
+URL Canonicalization
+
+This module turns the many spellings of a company URL into one form:
+1. canonicalize_url: a fetchable URL with a scheme, lower-case ASCII (IDNA) host,
+   no default port, fragment or tracking parameters, and no trailing slash
+2. canonical_key: a dedup key that also ignores the scheme and a leading 'www.'
+3. dedupe_urls: collapse a batch to one URL per key while remembering where each
+   input went
+"""
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only carry tracking information
+TRACKING_PARAMS = {
+    'gclid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'igshid', 'ref', 'ref_src', 'trk', 'trkInfo', 'lipi'
+}
+
+# Tracking parameter prefixes (utm_source, utm_medium, ...)
+TRACKING_PREFIXES = ('utm_', 'hsa_', 'pk_')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def _is_tracking_param(name):
+    return name in TRACKING_PARAMS or name.lower().startswith(TRACKING_PREFIXES)
+
+def _idna_host(host):
+    """Lower-case a host and convert internationalized labels to punycode"""
+    host = host.strip().rstrip('.').lower()
+    try:
+        return host.encode('idna').decode('ascii')
+    except UnicodeError:
+        return host
+
+def canonicalize_url(url, strip_query=False):
+    """
+    Normalize a URL so equivalent spellings compare equal
+
+    Args:
+        url: URL or bare domain (https:// is assumed when no scheme is given)
+        strip_query: Drop the whole query string instead of only tracking parameters
+
+    Returns:
+        str: Canonical URL, e.g. 'https://example.com/about'
+    """
+    url = url.strip()
+    if not url.lower().startswith(('http://', 'https://')):
+        url = 'https://' + url.lstrip('/')
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = _idna_host(parts.hostname or '')
+
+    try:
+        port = parts.port
+    except ValueError:
+        # Malformed port; keep just the host
+        port = None
+
+    netloc = host
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{port}"
+    if parts.username:
+        credentials = parts.username + (f":{parts.password}" if parts.password else '')
+        netloc = f"{credentials}@{netloc}"
+
+    path = parts.path.rstrip('/')
+
+    query = ''
+    if not strip_query and parts.query:
+        params = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                  if not _is_tracking_param(name)]
+        query = urlencode(sorted(params))
+
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+def canonical_key(url):
+    """
+    Get the dedup key for a URL
+
+    Two URLs with the same key point at the same page for our purposes: the scheme
+    and a leading 'www.' are ignored on top of canonicalize_url.
+
+    Args:
+        url: URL or bare domain
+
+    Returns:
+        str: Key such as 'example.com/about'
+    """
+    parts = urlsplit(canonicalize_url(url))
+    netloc = parts.netloc
+    if netloc.startswith('www.'):
+        netloc = netloc[4:]
+    query = f"?{parts.query}" if parts.query else ''
+    return f"{netloc}{parts.path}{query}"
+
+def dedupe_urls(urls):
+    """
+    Collapse a batch to one canonical URL per dedup key
+
+    Args:
+        urls: Input URLs, possibly with duplicate spellings
+
+    Returns:
+        tuple: (unique canonical URLs in first-seen order,
+                list mapping each input position to its index in the unique list)
+    """
+    unique = []
+    positions = []
+    seen = {}
+    for url in urls:
+        key = canonical_key(url)
+        if key not in seen:
+            seen[key] = len(unique)
+            unique.append(canonicalize_url(url))
+        positions.append(seen[key])
+    return unique, positions